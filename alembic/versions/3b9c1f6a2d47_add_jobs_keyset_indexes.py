@@ -0,0 +1,41 @@
+"""add jobs keyset pagination indexes
+
+Revision ID: 3b9c1f6a2d47
+Revises: ee4d2e314a0a
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c1f6a2d47'
+down_revision: Union[str, Sequence[str], None] = 'ee4d2e314a0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction; avoids locking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_created_at_id', 'jobs',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_jobs_status_created_at_id', 'jobs',
+            ['status', sa.text('created_at DESC'), sa.text('id DESC')],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_status_created_at_id', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_created_at_id', table_name='jobs', postgresql_concurrently=True)
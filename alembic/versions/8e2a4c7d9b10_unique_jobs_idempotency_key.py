@@ -0,0 +1,50 @@
+"""unique partial index on jobs.idempotency_key
+
+Revision ID: 8e2a4c7d9b10
+Revises: 3b9c1f6a2d47
+Create Date: 2026-10-18 10:03:54.118270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2a4c7d9b10'
+down_revision: Union[str, Sequence[str], None] = '3b9c1f6a2d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicates created by the old SELECT-then-INSERT race would block the unique
+    # index: keep the key on the oldest job only.
+    op.execute(
+        """
+        UPDATE jobs SET idempotency_key = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY idempotency_key ORDER BY created_at, id
+                ) AS rn
+                FROM jobs
+                WHERE idempotency_key IS NOT NULL
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+        """
+    )
+    op.create_index(
+        'ux_jobs_idempotency_key', 'jobs', ['idempotency_key'],
+        unique=True, postgresql_where=sa.text('idempotency_key IS NOT NULL'),
+    )
+    op.drop_index(op.f('ix_jobs_idempotency_key'), table_name='jobs')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_jobs_idempotency_key'), 'jobs', ['idempotency_key'], unique=False)
+    op.drop_index('ux_jobs_idempotency_key', table_name='jobs')
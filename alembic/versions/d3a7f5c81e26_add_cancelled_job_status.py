@@ -0,0 +1,30 @@
+"""add cancelled to jobstatus
+
+Revision ID: d3a7f5c81e26
+Revises: 6b1e8f4a2c95
+Create Date: 2026-10-18 19:26:44.871502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f5c81e26'
+down_revision: Union[str, Sequence[str], None] = '6b1e8f4a2c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A new enum value cannot be used in the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'cancelled'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value: keep it, but leave no row using it
+    op.execute("UPDATE jobs SET status = 'failed', error_message = 'Cancelled' WHERE status = 'cancelled'")
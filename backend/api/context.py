@@ -0,0 +1,40 @@
+import uuid
+from structlog.contextvars import bound_contextvars
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Longer caller-supplied ids are replaced, not logged
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestContextMiddleware:
+    """Pure ASGI middleware binding a request id to every log event of the request.
+
+    Reuses the caller's X-Request-ID (so one id follows a request across services)
+    or generates one, and returns it in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER and 0 < len(value) <= MAX_REQUEST_ID_LENGTH:
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        with bound_contextvars(request_id=request_id):
+            await self.app(scope, receive, send_wrapper)
@@ -1,6 +1,9 @@
-from fastapi import Security, HTTPException, status
+from fastapi import Request, Security, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.core_config import settings
+from backend.services.events import JobEventHub
+from backend.services.queue import JobQueue
+from backend.services.status_cache import JobStatusCache
 
 security = HTTPBearer()
 
@@ -11,3 +14,13 @@ async def verify_api_key(auth: HTTPAuthorizationCredentials = Security(security)
             detail="Invalid or missing API Key",
         )
     return auth.credentials
+
+def get_job_queue(request: Request) -> JobQueue:
+    # Created once per process in the app lifespan (backend/main.py)
+    return request.app.state.job_queue
+
+def get_status_cache(request: Request) -> JobStatusCache:
+    return request.app.state.status_cache
+
+def get_event_hub(request: Request) -> JobEventHub:
+    return request.app.state.event_hub
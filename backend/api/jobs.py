@@ -1,15 +1,25 @@
+import asyncio
 import os
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.api.deps import verify_api_key
-from backend.db.session import get_db
-from backend.db.models import JobStatus
-from backend.domain.jobs import JobCreate, JobRead
+from backend.api.deps import get_event_hub, get_job_queue, get_status_cache, verify_api_key
+from backend.db.session import SessionLocal, get_db, get_read_db
+from backend.compression import iter_decompressed
+from backend.core_config import settings
+from backend.db.models import TERMINAL_STATUSES, Job, JobStatus
+from backend.domain.jobs import (
+    JobBatchCreate, JobBatchItemResult, JobBatchRead, JobCreate, JobRead, JobStatusBatchQuery,
+    JobStatusBatchRead, decode_cursor, dump_job_rows, dump_job_statuses, encode_cursor, parse_fields,
+)
 from backend.repo.jobs import JobsRepo
 from backend.services.jobs import JobsService
-from datetime import datetime
-from fastapi.responses import FileResponse
+from backend.services.events import JobEventHub
+from backend.services.queue import JobQueue
+from backend.services.status_cache import CachedStatus, JobStatusCache
+from backend.storage import iter_file, storage_for
+from datetime import datetime, timezone
+from fastapi.responses import FileResponse, StreamingResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(verify_api_key)])
 
@@ -17,11 +27,41 @@ router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(verify_a
 async def create_job(
     job_in: JobCreate,
     idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    client_id: Optional[str] = Header(None, alias="X-Client-Id"),
     db: AsyncSession = Depends(get_db),
+    queue: JobQueue = Depends(get_job_queue),
 ):
     repo = JobsRepo(db)
-    service = JobsService(repo)
-    return await service.create_job(job_in, idempotency_key=idempotency_key)
+    service = JobsService(repo, queue)
+    return await service.create_job(job_in, idempotency_key=idempotency_key, client_id=client_id)
+
+@router.post("/batch", response_model=JobBatchRead, status_code=status.HTTP_201_CREATED)
+async def create_jobs_batch(
+    batch_in: JobBatchCreate,
+    client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+    db: AsyncSession = Depends(get_db),
+    queue: JobQueue = Depends(get_job_queue),
+):
+    repo = JobsRepo(db)
+    service = JobsService(repo, queue)
+    results = await service.create_jobs(batch_in.items, client_id=client_id)
+    return JobBatchRead(
+        items=[
+            JobBatchItemResult(job=JobRead.model_validate(job), deduplicated=deduplicated)
+            for job, deduplicated in results
+        ]
+    )
+
+@router.post("/status:batch", response_model=JobStatusBatchRead)
+async def get_job_statuses(
+    query: JobStatusBatchQuery,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Status of many jobs in one query, for dashboards polling a set of job ids."""
+    # Taken before the read: a job updated while it runs is returned again next time
+    as_of = datetime.now(timezone.utc)
+    rows = await JobsRepo(db).get_statuses(query.ids, since=query.since)
+    return Response(content=dump_job_statuses(rows, as_of), media_type="application/json")
 
 @router.get("/", response_model=List[JobRead])
 async def list_jobs(
@@ -30,40 +70,228 @@ async def list_jobs(
     created_before: Optional[datetime] = None,
     limit: int = 100,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated JobRead fields to return (default: all)"),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    keyset = None
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+        try:
+            keyset = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     repo = JobsRepo(db)
-    return await repo.list_jobs(
+    rows = await repo.list_job_rows(
+        selected,
         status=status,
         created_after=created_after,
         created_before=created_before,
         limit=limit,
         offset=offset,
+        cursor=keyset,
+    )
+    headers = {}
+    # A full page may have a successor; pass this back as ?cursor= to fetch it
+    if rows and len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    # Rows are serialized directly (response_model only documents the shape): no ORM
+    # objects and no per-row JobRead validation on the hottest read path
+    return Response(
+        content=dump_job_rows(rows, selected), media_type="application/json", headers=headers
     )
 
-@router.get("/{job_id}", response_model=JobRead)
-async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def _status_response(entry: CachedStatus, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+async def _get_job_from_read_db(job_id: str, db: AsyncSession) -> Optional[Job]:
     repo = JobsRepo(db)
     job = await repo.get_by_id(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    if job is None and settings.sqlalchemy_replica_uri:
+        # A job created moments ago may not have reached the replica yet
+        async with SessionLocal() as primary:
+            job = await JobsRepo(primary).get_by_id(job_id)
+    return job
+
+async def _load_status(job_id: str, db: AsyncSession, status_cache: JobStatusCache) -> CachedStatus:
+    # Cached bodies are already serialized JobRead JSON: a hit skips the DB and Pydantic
+    entry = await status_cache.get(job_id)
+    if entry is None:
+        job = await _get_job_from_read_db(job_id, db)
+        # Release the pooled connection now; callers may park for a long time
+        await db.close()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        entry = await status_cache.set(job, overwrite=False)
+    return entry
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(
+    job_id: str,
+    wait: Optional[float] = Query(None, ge=0, le=settings.LONG_POLL_MAX_WAIT_SECONDS),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_read_db),
+    status_cache: JobStatusCache = Depends(get_status_cache),
+    event_hub: JobEventHub = Depends(get_event_hub),
+):
+    if not wait:
+        entry = await _load_status(job_id, db, status_cache)
+        return _status_response(entry, if_none_match)
+
+    # Long poll: hold the request until the job differs from the client's ETag
+    # (or, without one, reaches a final status), or `wait` seconds pass.
+    def settled(entry: CachedStatus) -> bool:
+        if if_none_match:
+            return not _etag_matches(if_none_match, entry.etag)
+        return entry.status in TERMINAL_STATUSES
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    with event_hub.subscribe(job_id) as waiter:
+        entry = await _load_status(job_id, db, status_cache)
+        while not settled(entry):
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await waiter.wait(remaining):
+                break
+            entry = waiter.entry or await _load_status(job_id, db, status_cache)
+    return _status_response(entry, if_none_match)
+
+@router.delete("/{job_id}", response_model=JobRead)
+async def cancel_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    queue: JobQueue = Depends(get_job_queue),
+    status_cache: JobStatusCache = Depends(get_status_cache),
+):
+    """Cancel a queued or running job; 409 if it already reached a final status."""
+    job, heir = await JobsService(JobsRepo(db), queue).cancel_job(job_id)
+    # Also the signal a worker running the job is waiting for
+    await status_cache.set(job, publish=True)
+    if heir is not None:
+        await status_cache.set(heir, publish=True)
     return job
 
+def _sse_message(entry: CachedStatus) -> bytes:
+    return f"event: status\nid: {entry.etag}\ndata: ".encode() + entry.body + b"\n\n"
+
+async def _stream_status_events(
+    job_id: str, first: CachedStatus, status_cache: JobStatusCache, event_hub: JobEventHub
+) -> AsyncIterator[bytes]:
+    with event_hub.subscribe(job_id) as waiter:
+        entry = await status_cache.get(job_id) or first
+        yield _sse_message(entry)
+        while entry.status not in TERMINAL_STATUSES:
+            if not await waiter.wait(settings.SSE_HEARTBEAT_SECONDS):
+                yield b": keep-alive\n\n"
+                continue
+            latest = waiter.entry or await status_cache.get(job_id)
+            if latest is None or latest.etag == entry.etag:
+                continue
+            entry = latest
+            yield _sse_message(entry)
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    status_cache: JobStatusCache = Depends(get_status_cache),
+    event_hub: JobEventHub = Depends(get_event_hub),
+):
+    """Server-Sent Events stream of the job's status; ends once it is final."""
+    first = await _load_status(job_id, db, status_cache)
+    return StreamingResponse(
+        _stream_status_events(job_id, first, status_cache, event_hub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    if not accept_encoding:
+        return False
+    accepted = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
 @router.get("/{job_id}/download")
-async def download_job_result(job_id: str, db: AsyncSession = Depends(get_db)):
-    repo = JobsRepo(db)
-    job = await repo.get_by_id(job_id)
+async def download_job_result(
+    job_id: str,
+    accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    job = await _get_job_from_read_db(job_id, db)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     if job.status != JobStatus.succeeded:
         raise HTTPException(status_code=400, detail="Job result is not available yet")
     
-    if not job.result_file_path or not os.path.exists(job.result_file_path):
+    if not job.result_file_path:
         raise HTTPException(status_code=404, detail="Result file not found")
-    
-    return FileResponse(
-        path=job.result_file_path,
-        filename=f"report_{job.id}.csv",
-        media_type="text/csv"
+
+    filename = f"report_{job.id}.csv"
+    encoding = job.result_encoding
+    storage = storage_for(job.result_file_path)
+    path = storage.local_path(job.result_file_path)
+    if path is not None:
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Result file not found")
+        # FileResponse honours Range / If-Range, so interrupted downloads can resume
+        if encoding is None:
+            return FileResponse(path=path, filename=filename, media_type="text/csv")
+        if _accepts_encoding(accept_encoding, encoding):
+            # Send the stored bytes as-is; ranges then refer to the encoded representation
+            return FileResponse(
+                path=path,
+                filename=filename,
+                media_type="text/csv",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+        body = iter_decompressed(path, encoding)
+    else:
+        # Remote object: streamed through as it is read from the bucket, without ranges
+        try:
+            stream = await asyncio.to_thread(storage.open, job.result_file_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Result file not found")
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Accept-Ranges": "none"}
+        if encoding is None:
+            return StreamingResponse(iter_file(stream), media_type="text/csv", headers=headers)
+        if _accepts_encoding(accept_encoding, encoding):
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+            return StreamingResponse(iter_file(stream), media_type="text/csv", headers=headers)
+        body = iter_decompressed(stream, encoding)
+    # Client can't decode it: decompress on the fly (sync iterator runs in the threadpool).
+    # Ranges are not supported on this path.
+    return StreamingResponse(
+        body,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Accept-Ranges": "none",
+            "Vary": "Accept-Encoding",
+        },
     )
@@ -0,0 +1,78 @@
+import time
+from typing import Dict, Tuple
+from fastapi import APIRouter, Depends, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core_config import settings
+from backend.db.models import TERMINAL_STATUSES, JobStatus
+from backend.db.session import get_read_db
+from backend.logger import logger
+from backend.metrics import HTTP_REQUEST_DURATION, JOBS_BY_STATUS, QUEUE_DEPTH
+from backend.repo.jobs import JobsRepo
+
+router = APIRouter(tags=["metrics"])
+
+_gauges_refreshed_at = 0.0
+# Terminal statuses only grow until retention drops them; counting them would scan
+# every partition on each scrape (finish rates: jobs_run_duration_seconds_count)
+_LIVE_STATUSES = [status for status in JobStatus if status not in TERMINAL_STATUSES]
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route request latency.
+
+    Labels use the route template (`/jobs/{job_id}`), not the raw path, to keep
+    cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._children: Dict[Tuple[str, str, int], object] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else "<unmatched>", status_code)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = HTTP_REQUEST_DURATION.labels(*key)
+            child.observe(time.perf_counter() - started)
+
+
+async def _refresh_gauges(request: Request, db: AsyncSession):
+    global _gauges_refreshed_at
+    now = time.monotonic()
+    if now - _gauges_refreshed_at < settings.METRICS_GAUGE_REFRESH_SECONDS:
+        return
+    _gauges_refreshed_at = now
+    try:
+        depths = await request.app.state.job_queue.depths()
+        counts = await JobsRepo(db).count_by_status(_LIVE_STATUSES)
+    except Exception as e:
+        logger.warning("metrics_gauge_refresh_failed", error=str(e))
+        return
+    for priority, depth in depths.items():
+        QUEUE_DEPTH.labels(priority=priority.value).set(depth)
+    for status in _LIVE_STATUSES:
+        JOBS_BY_STATUS.labels(status=status.value).set(counts.get(status, 0))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request, db: AsyncSession = Depends(get_read_db)):
+    await _refresh_gauges(request, db)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,64 @@
+import gzip
+import io
+from contextlib import closing
+from typing import IO, BinaryIO, Iterator, Optional, Union
+from backend.core_config import settings
+
+# Content-Encoding tokens; also stored in Job.result_encoding (None = uncompressed)
+GZIP = "gzip"
+ZSTD = "zstd"
+ENCODINGS = (GZIP, ZSTD)
+FILE_SUFFIXES = {None: "", GZIP: ".gz", ZSTD: ".zst"}
+
+
+def _zstandard():
+    # Optional dependency, only needed when zstd artifacts are written or decoded
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd result compression requires the 'zstandard' package") from e
+    return zstandard
+
+
+def configured_encoding() -> Optional[str]:
+    encoding = settings.RESULT_COMPRESSION.lower()
+    if encoding in ("", "none", "identity"):
+        return None
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unsupported RESULT_COMPRESSION {settings.RESULT_COMPRESSION!r}")
+    return encoding
+
+
+def open_text_writer(path: str, encoding: Optional[str]) -> IO[str]:
+    """Open `path` for CSV text output, compressing with `encoding` if set."""
+    if encoding is None:
+        return open(path, mode="w", newline="", buffering=settings.REPORT_WRITE_BUFFER_BYTES)
+    if encoding == GZIP:
+        binary = gzip.open(path, mode="wb", compresslevel=settings.RESULT_GZIP_LEVEL)
+    elif encoding == ZSTD:
+        raw = open(path, mode="wb", buffering=settings.REPORT_WRITE_BUFFER_BYTES)
+        compressor = _zstandard().ZstdCompressor(level=settings.RESULT_ZSTD_LEVEL)
+        binary = compressor.stream_writer(raw, closefd=True)
+    else:
+        raise ValueError(f"Unsupported encoding {encoding!r}")
+    return io.TextIOWrapper(binary, encoding="utf-8", newline="")
+
+
+def iter_decompressed(
+    source: Union[str, BinaryIO], encoding: str, chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Yield the decoded content of a compressed artifact without loading it whole.
+
+    `source` is a path or an open binary stream (e.g. an S3 object body), closed at the end.
+    """
+    raw = open(source, mode="rb") if isinstance(source, str) else source
+    with closing(raw):
+        if encoding == GZIP:
+            f = gzip.GzipFile(fileobj=raw, mode="rb")
+        elif encoding == ZSTD:
+            f = _zstandard().ZstdDecompressor().stream_reader(raw)
+        else:
+            raise ValueError(f"Unsupported encoding {encoding!r}")
+        with f:
+            while chunk := f.read(chunk_size):
+                yield chunk
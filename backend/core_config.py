@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -9,21 +11,142 @@ class Settings(BaseSettings):
     # Auth
     API_KEY: str = "supersecretkey"
 
+    # In-process idempotency key -> created job cache (0 disables)
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 60.0
+
+    # GET /jobs/{job_id} status cache: Redis entry TTL and in-process front layer
+    STATUS_CACHE_TTL_SECONDS: int = 300
+    STATUS_CACHE_LOCAL_SIZE: int = 10000
+    STATUS_CACHE_LOCAL_TTL_SECONDS: float = 1.0
+
+    # Push updates: GET /jobs/{job_id}?wait= upper bound and SSE keep-alive interval
+    LONG_POLL_MAX_WAIT_SECONDS: float = 60.0
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+
+    # Jobs with run_at further out than this stay in Postgres only; the worker's
+    # dispatch_scheduled_jobs cron (every minute) enqueues them once they come within
+    # it. Keep well above a minute.
+    SCHEDULER_HORIZON_SECONDS: float = 3600.0
+    # Jobs enqueued per dispatch transaction
+    SCHEDULER_BATCH_SIZE: int = 1000
+
+    # Max items accepted by POST /jobs/batch
+    JOBS_BATCH_MAX_SIZE: int = 5000
+    # Max ids accepted by POST /jobs/status:batch
+    JOB_STATUS_BATCH_MAX_IDS: int = 5000
+
     # Postgres
     POSTGRES_SERVER: str = "db"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "backend"
+    # Optional read replica (same credentials/database) for API read endpoints
+    POSTGRES_REPLICA_SERVER: Optional[str] = None
+
+    # SQLAlchemy engine / pool (applies to primary and replica engines)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Connections opened at API / worker startup (per pool, capped at DB_POOL_SIZE) so the
+    # first requests and jobs skip connection setup; the Redis pools are warmed alike
+    POOL_PREWARM_CONNECTIONS: int = 4
+    SQL_ECHO: bool = False
     
     @property
     def sqlalchemy_database_uri(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
+    @property
+    def sqlalchemy_replica_uri(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_SERVER}/{self.POSTGRES_DB}"
+
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    # Shared Arq pool used by the API (max open connections)
+    REDIS_POOL_SIZE: int = 20
+    # Enqueues issued within this window are flushed in one pipeline
+    ENQUEUE_BATCH_WINDOW_MS: float = 2.0
+    ENQUEUE_BATCH_MAX_SIZE: int = 500
+    # Priority lanes (one Arq queue per job priority): share of worker job slots each
+    # lane gets while several lanes have work waiting
+    QUEUE_WEIGHTS: Dict[str, int] = {"high": 6, "normal": 3, "low": 1}
+
+    @field_validator("QUEUE_WEIGHTS")
+    @classmethod
+    def _positive_weights(cls, weights: Dict[str, int]) -> Dict[str, int]:
+        # A lane's share is running / weight: 0 would divide by zero in the worker
+        bad = {lane: weight for lane, weight in weights.items() if weight <= 0}
+        if bad:
+            raise ValueError(f"QUEUE_WEIGHTS must be positive, got {bad}")
+        return weights
+
+    # How often each worker gives due deferred jobs their fair-queueing start tag,
+    # and how many per lane at a time
+    DEFERRED_PROMOTE_INTERVAL_SECONDS: float = 0.5
+    DEFERRED_PROMOTE_BATCH_SIZE: int = 1000
 
     # Files
     FILES_DIR: str = "data/files"
+    # Result artifact storage (backend/storage.py): "local" (under FILES_DIR, in
+    # FILES_SHARD_DEPTH levels of 256 hash-named directories) or "s3" (needs boto3)
+    RESULT_STORAGE: str = "local"
+    FILES_SHARD_DEPTH: int = 2
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = "results/"
+    # S3-compatible stand-in such as MinIO (docker-compose --profile s3); None = AWS
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_MULTIPART_CHUNK_BYTES: int = 8 * 1024 * 1024
+    # Report rows handed to the writer thread per batch, and its file buffer size
+    REPORT_ROW_BATCH_SIZE: int = 5000
+    REPORT_WRITE_BUFFER_BYTES: int = 1024 * 1024
+    # Result artifact compression: "none", "gzip" or "zstd" (needs the zstandard package)
+    RESULT_COMPRESSION: str = "none"
+    RESULT_GZIP_LEVEL: int = 6
+    RESULT_ZSTD_LEVEL: int = 3
+    # Reuse fresh artifacts of identical requests for templates with a cache_ttl
+    # (keep cache_ttl well below JOB_RETENTION_DAYS)
+    RESULT_CACHE_ENABLED: bool = False
+
+    # Worker: concurrent Arq jobs per process, and processes for "process" templates
+    # (0 = one per CPU core)
+    WORKER_MAX_JOBS: int = 10
+    WORKER_PROCESS_POOL_SIZE: int = 0
+    # Job deadlines: a render running past its template's timeout (TEMPLATE_TIMEOUTS,
+    # else JOB_TIMEOUT_SECONDS) stops at the next row batch and the job fails. Arq's own
+    # job_timeout, the longest of them plus JOB_TIMEOUT_GRACE_SECONDS, is the last resort
+    # for a render that never reaches a batch boundary.
+    JOB_TIMEOUT_SECONDS: float = 600.0
+    TEMPLATE_TIMEOUTS: Dict[str, float] = {"report_v1": 30.0, "jobs_export_v1": 1800.0}
+    JOB_TIMEOUT_GRACE_SECONDS: float = 60.0
+
+    # Metrics: worker exposes Prometheus metrics on this port (0 disables); the API's
+    # /metrics recomputes queue depth and jobs-by-status gauges at most this often
+    WORKER_METRICS_PORT: int = 9100
+    METRICS_GAUGE_REFRESH_SECONDS: float = 15.0
+
+    # Logging: events are buffered (up to LOG_QUEUE_SIZE, then dropped and counted) and
+    # written by a background thread in batches of up to LOG_BATCH_SIZE; 0 writes
+    # synchronously. LOG_SAMPLE_RATES keeps that fraction of the named events.
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 512
+    LOG_SAMPLE_RATES: Dict[str, float] = {"health_check_called": 0.01, "processing_job_started": 0.1}
+
+    # Retention (cleanup_old_jobs cron)
+    JOB_RETENTION_DAYS: int = 30
+    # Daily jobs partitions kept created ahead of today
+    JOB_PARTITION_PREMAKE_DAYS: int = 7
+    # Result paths read, checked and unlinked per batch when a partition is dropped
+    CLEANUP_BATCH_SIZE: int = 1000
+    # Threads used to unlink result files concurrently
+    CLEANUP_UNLINK_WORKERS: int = 16
+    # sweep_orphan_results: stored artifacts no job references are deleted once older
+    # than this (younger ones may belong to a job still being rendered or committed)
+    ORPHAN_SWEEP_MIN_AGE_SECONDS: int = 24 * 3600
 
 settings = Settings()
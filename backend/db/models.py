@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import String, DateTime, Enum, JSON
+from sqlalchemy import String, DateTime, Enum, Index, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from backend.db.session import Base
 
@@ -10,15 +10,35 @@ class JobStatus(str, enum.Enum):
     running = "running"
     succeeded = "succeeded"
     failed = "failed"
+    # By the client (DELETE /jobs/{job_id}), while queued or running
+    cancelled = "cancelled"
+
+class JobPriority(str, enum.Enum):
+    # One Arq queue ("lane") per priority, see backend/services/queue.py
+    high = "high"
+    normal = "normal"
+    low = "low"
+
+# No further transitions after these
+TERMINAL_STATUSES = frozenset({JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled})
 
 class Job(Base):
     __tablename__ = "jobs"
+    # One partition per UTC day of created_at (backend/repo/partitions.py); retention
+    # drops whole partitions. The primary key, like any unique index, must include
+    # the partition key.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
-    idempotency_key: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     status: Mapped[JobStatus] = mapped_column(
         Enum(JobStatus), default=JobStatus.queued, index=True
     )
+    priority: Mapped[JobPriority] = mapped_column(
+        Enum(JobPriority), default=JobPriority.normal, server_default=JobPriority.normal.value
+    )
+    # Submitting client (X-Client-Id); jobs are fair-queued per client within a lane
+    client_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     
     # Metadata and parameters
     template_name: Mapped[str] = mapped_column(String)
@@ -30,7 +50,7 @@ class Job(Base):
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
@@ -38,8 +58,67 @@ class Job(Base):
         onupdate=lambda: datetime.now(timezone.utc)
     )
     run_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # NULL while a job due beyond SCHEDULER_HORIZON_SECONDS is held in Postgres only;
+    # set at creation otherwise, or when dispatch_scheduled_jobs enqueues it
+    dispatched_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Result info
     result_file_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Content-Encoding of the stored file ("gzip", "zstd"); None if uncompressed
+    result_encoding: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Result memoization (backend/reports/registry.py, ReportTemplate.cache_key): hash
+    # of template, version and canonical params; and, for jobs answered from the cache
+    # or coalesced onto an identical in-flight job, the job whose artifact they share
+    result_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    result_source_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+# Keyset pagination for GET /jobs/: ORDER BY created_at DESC, id DESC, optionally filtered by status
+Index("ix_jobs_created_at_id", Job.created_at.desc(), Job.id.desc())
+Index("ix_jobs_status_created_at_id", Job.status, Job.created_at.desc(), Job.id.desc())
+
+# Held scheduled jobs, by due time (dispatch_scheduled_jobs)
+Index(
+    "ix_jobs_run_at_held",
+    Job.run_at,
+    postgresql_where=(Job.status == JobStatus.queued) & Job.dispatched_at.is_(None),
+)
+
+# Stored artifact -> jobs referencing it (sweep_orphan_results, shared memoized results
+# when a partition is dropped)
+Index(
+    "ix_jobs_result_file_path",
+    Job.result_file_path,
+    postgresql_where=Job.result_file_path.isnot(None),
+)
+
+# Freshest computed artifact for a result key
+Index(
+    "ix_jobs_result_key_completed_at",
+    Job.result_key,
+    Job.completed_at.desc(),
+    postgresql_where=Job.result_key.isnot(None),
+)
+
+# Uniqueness across all partitions cannot be a unique index on jobs (it would have to
+# include created_at), so keys are claimed by primary-key inserts into these side
+# tables, in the same transaction as the job insert. Rows carry the job's created_at:
+# lookups go straight to the right partition, and they are deleted with it.
+
+class JobIdempotencyKey(Base):
+    """At most one job per idempotency key."""
+    __tablename__ = "job_idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+class JobResultLeader(Base):
+    """At most one in-flight computation per result key; identical requests that find
+    one are stored as followers (Job.result_source_id) of that job."""
+    __tablename__ = "job_result_leaders"
+
+    result_key: Mapped[str] = mapped_column(String, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,10 +1,31 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, configure_mappers
 from backend.core_config import settings
+from backend.metrics import instrument_engine
 
-engine = create_async_engine(
-    settings.sqlalchemy_database_uri,
-    echo=True, # Set to False in production
+def _create_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.SQL_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # asyncpg prepared statement cache; set to 0 behind pgbouncer (transaction mode)
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    instrument_engine(engine)
+    return engine
+
+engine = _create_engine(settings.sqlalchemy_database_uri)
+
+# Read-only replica for API reads; falls back to the primary when not configured
+read_engine = (
+    _create_engine(settings.sqlalchemy_replica_uri)
+    if settings.sqlalchemy_replica_uri
+    else engine
 )
 
 SessionLocal = async_sessionmaker(
@@ -15,9 +36,43 @@ SessionLocal = async_sessionmaker(
     class_=AsyncSession,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=AsyncSession,
+)
+
 class Base(DeclarativeBase):
     pass
 
+async def warm_pool(engine: AsyncEngine, connections: int = settings.POOL_PREWARM_CONNECTIONS):
+    """Open `connections` pooled connections now and leave them idle in the pool.
+
+    Engines connect lazily, so otherwise the first requests (or jobs) after a deploy
+    pay for TCP/TLS, authentication and asyncpg's type introspection.
+    """
+    # Mapper configuration also runs on first use otherwise
+    configure_mappers()
+
+    async def connect():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrently, so each one opens its own connection
+    await asyncio.gather(*(connect() for _ in range(min(connections, settings.DB_POOL_SIZE))))
+
+async def dispose_engines():
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
+
+async def get_read_db():
+    # Replica reads may lag the primary slightly; never write through this session
+    async with ReadSessionLocal() as session:
+        yield session
@@ -1,24 +1,118 @@
-from pydantic import BaseModel, Field, ConfigDict
+import base64
+import json
+import orjson
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, field_validator, model_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
-from backend.db.models import JobStatus
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
+from backend.core_config import settings
+from backend.db.models import JobPriority, JobStatus
+from backend.reports import TEMPLATES
 
 class JobBase(BaseModel):
-    template_name: str = Field(..., pattern="^report_v1$")
+    template_name: str
     metadata_info: Optional[Dict[str, Any]] = None
     run_at: Optional[datetime] = None
+    priority: JobPriority = JobPriority.normal
 
 class JobCreate(JobBase):
-    pass
+    @field_validator("template_name")
+    @classmethod
+    def template_must_be_registered(cls, v: str) -> str:
+        if v not in TEMPLATES:
+            raise ValueError(f"Unknown template; expected one of: {', '.join(sorted(TEMPLATES))}")
+        return v
+
+    @model_validator(mode="after")
+    def metadata_must_match_template(self) -> "JobCreate":
+        template = TEMPLATES[self.template_name]
+        try:
+            template.parse_params(self.metadata_info)
+        except ValidationError as e:
+            raise ValueError(f"Invalid metadata_info for {self.template_name}: {e}") from None
+        return self
 
 class JobRead(JobBase):
     model_config = ConfigDict(from_attributes=True)
     
     id: str
     status: JobStatus
+    client_id: Optional[str] = None
     error_message: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result_file_path: Optional[str] = None
+    result_encoding: Optional[str] = None
+
+# JobRead fields in response order; GET /jobs/?fields= selects a subset
+JOB_READ_FIELDS: Tuple[str, ...] = tuple(JobRead.model_fields)
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Comma-separated field names -> JobRead fields, in response order (all if empty)."""
+    if not fields:
+        return JOB_READ_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(JOB_READ_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in JOB_READ_FIELDS if name in requested)
+
+def dump_job_rows(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> bytes:
+    """JSON array of job rows whose leading columns are `fields`.
+
+    Same output as a List[JobRead] response (datetimes in UTC as "Z", enums as their
+    values) without building a model per row; extra trailing columns are ignored.
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows], option=orjson.OPT_UTC_Z)
+
+class JobBatchItem(JobCreate):
+    idempotency_key: Optional[str] = None
+
+class JobBatchCreate(BaseModel):
+    items: List[JobBatchItem] = Field(..., min_length=1, max_length=settings.JOBS_BATCH_MAX_SIZE)
+
+class JobBatchItemResult(BaseModel):
+    job: JobRead
+    deduplicated: bool = False
+
+class JobBatchRead(BaseModel):
+    items: List[JobBatchItemResult]
+
+class JobStatusBatchQuery(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=settings.JOB_STATUS_BATCH_MAX_IDS)
+    # Only jobs updated at or after this time (pass back the previous response's as_of)
+    since: Optional[datetime] = None
+
+class JobStatusSummary(BaseModel):
+    status: JobStatus
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+class JobStatusBatchRead(BaseModel):
+    as_of: datetime
+    # Unknown ids, and jobs unchanged since `since`, are left out
+    jobs: Dict[str, JobStatusSummary]
+
+def dump_job_statuses(rows: Iterable[Sequence[Any]], as_of: datetime) -> bytes:
+    """JobStatusBatchRead JSON from (id, status, updated_at, completed_at, error_message) rows."""
+    jobs = {
+        job_id: {"status": status, "updated_at": updated_at, "completed_at": completed_at, "error": error}
+        for job_id, status, updated_at, completed_at, error in rows
+    }
+    return orjson.dumps({"as_of": as_of, "jobs": jobs}, option=orjson.OPT_UTC_Z)
+
+
+def encode_cursor(created_at: datetime, job_id: str) -> str:
+    """Opaque keyset cursor for GET /jobs/, pointing at the last row of a page."""
+    raw = json.dumps([created_at.isoformat(), job_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(job_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
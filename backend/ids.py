@@ -0,0 +1,35 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def new_job_id(now: datetime) -> str:
+    """A UUIDv7 job id: `now` in unix milliseconds, then 74 random bits.
+
+    The id carries the job's created_at (job_created_at), so lookups by id can name
+    the one daily partition to search instead of probing all of them.
+    """
+    ms = (now - _EPOCH) // timedelta(milliseconds=1)
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ms & (1 << 48) - 1) << 80
+        | 0x7 << 76
+        | (rand >> 62 & 0xFFF) << 64
+        | 0b10 << 62
+        | rand & (1 << 62) - 1
+    )
+    return str(uuid.UUID(int=value))
+
+
+def job_created_at(job_id: str) -> Optional[datetime]:
+    """created_at of a job whose id came from new_job_id; None for other ids (UUIDv4)."""
+    try:
+        value = uuid.UUID(job_id)
+    except ValueError:
+        return None
+    if value.version != 7:
+        return None
+    return _EPOCH + timedelta(milliseconds=value.int >> 80)
@@ -0,0 +1,9 @@
+"""Reference point for the import phase of the startup metric.
+
+backend.main and worker.main import this before anything else, so
+time.perf_counter() - IMPORT_STARTED once their own imports are done is what loading
+them took (the interpreter's own startup is not included).
+"""
+import time
+
+IMPORT_STARTED = time.perf_counter()
@@ -1,15 +1,174 @@
-import structlog
+import atexit
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, List, Mapping, Optional
+import orjson
+import structlog
+from structlog.contextvars import merge_contextvars
+from backend.core_config import settings
+from backend.metrics import LOG_EVENTS_DROPPED
+
+_STOP = object()
+
+
+class QueueLogSink:
+    """Bounded buffer of log events, rendered to JSON and written by a background thread.
+
+    The caller only appends the event dict (and a raw timestamp): JSON rendering and
+    the write to stdout happen on the writer thread, in batches of whatever has
+    accumulated, so a slow log consumer never blocks the event loop. When the buffer
+    is full, new events are dropped and counted (log_events_dropped_total{reason="overflow"}).
+    """
+
+    def __init__(self, stream=None, max_size: int = 10000, batch_size: int = 512):
+        self.stream = stream or sys.stdout.buffer
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self._overflow = LOG_EVENTS_DROPPED.labels(reason="overflow")
+        self._start()
+
+    def _start(self):
+        self._queue: "queue.Queue[Any]" = queue.Queue(self.max_size)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._overflow.inc()
+
+    def close(self, timeout: float = 5.0):
+        """Write out what is buffered and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(event is _STOP for event in batch)
+            self._write([event for event in batch if event is not _STOP])
+            if stop:
+                return
+
+    def _write(self, events: List[Dict[str, Any]]):
+        lines = []
+        for event in events:
+            ts = event.pop("_ts", None)
+            if ts is not None:
+                event["timestamp"] = datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+            lines.append(orjson.dumps(event, default=str))
+        try:
+            self.stream.write(b"\n".join(lines) + b"\n")
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Closed or broken stdout: nothing better to do with log lines
+            pass
+
+
+class QueueLogger:
+    """structlog logger handing the processed event dict to a QueueLogSink."""
+
+    def __init__(self, sink: QueueLogSink):
+        self._sink = sink
+
+    def msg(self, **event: Any):
+        self._sink.put(event)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, sink: QueueLogSink):
+        self._logger = QueueLogger(sink)
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return self._logger
+
+
+def sample_events(rates: Mapping[str, float]):
+    """Processor keeping only a `rates[event]` fraction of the listed high-volume events."""
+    sampled = LOG_EVENTS_DROPPED.labels(reason="sampled")
+
+    def processor(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        rate = rates.get(event_dict.get("event"))
+        if rate is not None and random.random() >= rate:
+            sampled.inc()
+            raise structlog.DropEvent
+        return event_dict
+    return processor
+
+
+def _add_raw_timestamp(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Formatted on the writer thread
+    event_dict["_ts"] = time.time()
+    return event_dict
+
+
+_sink: Optional[QueueLogSink] = None
+
+
+def _close_sink():
+    if _sink is not None:
+        _sink.close()
+
+
+def _restart_sink_in_child():
+    # A forked child has the sink's buffer but not its writer thread: give the sink
+    # that is active at fork time a fresh one (sinks replaced earlier are not touched)
+    if _sink is not None:
+        _sink._start()
+
+atexit.register(_close_sink)
+os.register_at_fork(after_in_child=_restart_sink_in_child)
+
+
+def setup_logging(async_sink: Optional[bool] = None, stream: Optional[IO] = None):
+    """Configure structlog: JSON lines on stdout (or `stream`), with bound request/job context.
+
+    By default (LOG_QUEUE_SIZE > 0) events go through a QueueLogSink; otherwise, or
+    with async_sink=False, they are rendered and printed synchronously by the caller.
+    """
+    global _sink
+    if async_sink is None:
+        async_sink = settings.LOG_QUEUE_SIZE > 0
+    processors = [
+        sample_events(settings.LOG_SAMPLE_RATES),
+        # request_id / job_id bound with structlog.contextvars.bound_contextvars
+        merge_contextvars,
+        structlog.processors.add_log_level,
+    ]
+    if async_sink:
+        if _sink is None or stream is not None:
+            _close_sink()
+            _sink = QueueLogSink(
+                stream, max_size=settings.LOG_QUEUE_SIZE or 10000, batch_size=settings.LOG_BATCH_SIZE
+            )
+        processors.append(_add_raw_timestamp)
+        logger_factory = QueueLoggerFactory(_sink)
+    else:
+        processors += [structlog.processors.TimeStamper(fmt="iso"), structlog.processors.JSONRenderer()]
+        logger_factory = structlog.PrintLoggerFactory(stream)
 
-def setup_logging():
     structlog.configure(
-        processors=[
-            structlog.processors.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer(),
-        ],
-        logger_factory=structlog.PrintLoggerFactory(),
+        processors=processors,
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
 
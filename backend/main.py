@@ -1,13 +1,68 @@
+from backend.import_clock import IMPORT_STARTED
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from backend.api.context import RequestContextMiddleware
 from backend.api.deps import verify_api_key
 from backend.api.jobs import router as jobs_router
+from backend.api.metrics import MetricsMiddleware, router as metrics_router
 from backend.logger import setup_logging, logger
+from backend.cache import TTLCache
+from backend.core_config import settings
+from backend.db.session import SessionLocal, dispose_engines, engine, read_engine, warm_pool
+from backend.metrics import STARTUP_SECONDS
+from backend.repo.partitions import JobPartitionsRepo
+from backend.services.events import JobEventHub
+from backend.services.queue import JobQueue, warm_redis
+from backend.services.status_cache import JobStatusCache
 
 setup_logging()
 
-app = FastAPI(title="Async Job Platform")
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_started = time.perf_counter()
+    # One Arq pool per process instead of one connection per POST /jobs/
+    app.state.job_queue = await JobQueue.connect()
+    app.state.status_cache = JobStatusCache(
+        app.state.job_queue.redis,
+        TTLCache(settings.STATUS_CACHE_LOCAL_SIZE, settings.STATUS_CACHE_LOCAL_TTL_SECONDS),
+    )
+    # Single pub/sub subscriber fanning out to SSE / long-poll waiters
+    app.state.event_hub = JobEventHub(app.state.job_queue.redis)
+    await app.state.event_hub.start()
+    # Open the pools before taking traffic, not on the first requests after a deploy
+    await asyncio.gather(
+        warm_pool(engine),
+        *([warm_pool(read_engine)] if read_engine is not engine else []),
+        warm_redis(app.state.job_queue.redis),
+    )
+    # Inserts into a day without a partition fail: do not leave creating them to the
+    # worker alone, or a stopped worker would eventually fail POST /jobs
+    async with SessionLocal() as session:
+        await JobPartitionsRepo(session).ensure_upcoming()
+    warmup_seconds = time.perf_counter() - warmup_started
+    STARTUP_SECONDS.labels(component="api", phase="import").set(IMPORT_SECONDS)
+    STARTUP_SECONDS.labels(component="api", phase="warmup").set(warmup_seconds)
+    logger.info(
+        "api_started",
+        import_seconds=round(IMPORT_SECONDS, 3),
+        warmup_seconds=round(warmup_seconds, 3),
+    )
+    yield
+    await app.state.event_hub.close()
+    await app.state.job_queue.close()
+    await dispose_engines()
+
+app = FastAPI(title="Async Job Platform", lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 @app.get("/health", dependencies=[Depends(verify_api_key)])
 async def health_check():
@@ -0,0 +1,142 @@
+import time
+from typing import TYPE_CHECKING, Dict
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+if TYPE_CHECKING:
+    from backend.db.models import Job
+
+# Seconds; jobs range from sub-second single-row reports to long exports
+JOB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Retention cleanup (worker cron)
+CLEANUP_DELETED_JOBS = Counter(
+    "jobs_cleanup_deleted_jobs_total", "Expired job rows deleted by cleanup_old_jobs"
+)
+CLEANUP_DROPPED_PARTITIONS = Counter(
+    "jobs_cleanup_dropped_partitions_total", "Expired daily jobs partitions dropped by cleanup_old_jobs"
+)
+CLEANUP_DELETED_FILES = Counter(
+    "jobs_cleanup_deleted_files_total", "Result files removed by cleanup_old_jobs"
+)
+CLEANUP_FILE_ERRORS = Counter(
+    "jobs_cleanup_file_errors_total", "Result files cleanup_old_jobs failed to remove"
+)
+CLEANUP_LAST_RUN_SECONDS = Gauge(
+    "jobs_cleanup_last_run_duration_seconds", "Duration of the last cleanup_old_jobs run"
+)
+
+# Stored artifacts without a job (worker cron)
+ORPHAN_SWEEP_DELETED_FILES = Counter(
+    "jobs_orphan_results_deleted_total", "Unreferenced result artifacts removed by sweep_orphan_results"
+)
+
+# Scheduled jobs moved from Postgres to the Arq queues (worker cron)
+SCHEDULER_DISPATCHED_JOBS = Counter(
+    "jobs_scheduler_dispatched_total", "Held scheduled jobs enqueued by dispatch_scheduled_jobs"
+)
+
+# Jobs stopped before completing. Saved time is an estimate: the template's average
+# render time (backend/services/run_estimates.py) minus the time the job already ran.
+JOBS_CANCELLED = Counter(
+    "jobs_cancelled_total", "Jobs cancelled by clients, by status at cancellation", ["template", "stage"]
+)
+JOBS_TIMED_OUT = Counter(
+    "jobs_timed_out_total", "Renders stopped at their template timeout", ["template"]
+)
+CANCELLED_SAVED_WORKER_SECONDS = Counter(
+    "jobs_cancelled_saved_worker_seconds_total",
+    "Estimated worker time saved by cancellations (average render time minus time already run)",
+    ["template", "stage"],
+)
+
+# GET /jobs/{job_id} status cache; hit ratio = (local_hit + redis_hit) / total
+JOB_STATUS_CACHE_REQUESTS = Counter(
+    "jobs_status_cache_requests_total", "Job status cache lookups", ["result"]
+)
+
+# Result memoization: hit = served a fresh artifact, coalesced = attached to an
+# identical in-flight job, miss = computed
+RESULT_CACHE_REQUESTS = Counter(
+    "jobs_result_cache_requests_total", "Result cache lookups for cacheable templates", ["result"]
+)
+
+# Log events not written: sampled out (LOG_SAMPLE_RATES) or buffer full (overflow)
+LOG_EVENTS_DROPPED = Counter(
+    "log_events_dropped_total", "Structured log events not written", ["reason"]
+)
+
+# Request / job / SQL latency. Label children are cached in plain dicts on the hot
+# paths: `.labels()` takes a lock and builds a tuple on every call.
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "API request latency", ["method", "route", "status"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ["operation"]
+)
+ENQUEUE_DURATION = Histogram(
+    "jobs_enqueue_duration_seconds", "Time to write one enqueue pipeline to Redis"
+)
+JOB_QUEUE_WAIT = Histogram(
+    "jobs_queue_wait_seconds",
+    "Time from created_at (or run_at, if later) to started_at",
+    ["template", "priority"],
+    buckets=JOB_BUCKETS,
+)
+JOB_RUN_DURATION = Histogram(
+    "jobs_run_duration_seconds",
+    "Time from started_at to completed_at",
+    ["template", "status"],
+    buckets=JOB_BUCKETS,
+)
+
+# Cold start, tracked over releases: import (module imports of the entry point),
+# warmup (pools opened in the startup hooks), first_job (worker: process start to
+# the first job finished)
+STARTUP_SECONDS = Gauge(
+    "jobs_startup_seconds", "Process startup phase durations", ["component", "phase"]
+)
+
+# Refreshed on scrape by the API's /metrics endpoint
+QUEUE_DEPTH = Gauge(
+    "jobs_queue_depth", "Tasks waiting in each priority lane's Arq queue (including deferred)",
+    ["priority"],
+)
+JOBS_BY_STATUS = Gauge("jobs_by_status", "Jobs currently queued or running, by status", ["status"])
+
+_db_query_children: Dict[str, Histogram] = {}
+
+
+def _db_query_histogram(statement: str) -> Histogram:
+    operation = statement.lstrip()[:6].upper()
+    child = _db_query_children.get(operation)
+    if child is None:
+        child = _db_query_children[operation] = DB_QUERY_DURATION.labels(operation=operation)
+    return child
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every SQL statement executed through `engine`."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _db_query_histogram(statement).observe(time.perf_counter() - context._metrics_started)
+
+
+def observe_job_timings(job: "Job"):
+    """Record queue wait and run time once a job reached a final status."""
+    template = job.template_name
+    if job.started_at:
+        ready_at = max(job.created_at, job.run_at) if job.run_at else job.created_at
+        JOB_QUEUE_WAIT.labels(template=template, priority=job.priority.value).observe(
+            max(0.0, (job.started_at - ready_at).total_seconds())
+        )
+        if job.completed_at:
+            JOB_RUN_DURATION.labels(template=template, status=job.status.value).observe(
+                (job.completed_at - job.started_at).total_seconds()
+            )
@@ -1,8 +1,50 @@
-from typing import Optional, Sequence
-from datetime import datetime
-from sqlalchemy import select
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from datetime import datetime, timezone
+from sqlalchemy import Row, Select, String, any_, bindparam, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.db.models import Job, JobStatus
+from backend.db.models import Job, JobIdempotencyKey, JobResultLeader, JobStatus
+from backend.ids import job_created_at
+
+INSERT_CHUNK_SIZE = 1000
+IN_FLIGHT_STATUSES = [JobStatus.queued, JobStatus.running]
+
+def _by_id(job_id: str):
+    # Ids from new_job_id carry created_at, so the lookup probes one partition instead
+    # of every partition's primary-key index (and an UPDATE plans and locks just it)
+    created_at = job_created_at(job_id)
+    if created_at is None:
+        return Job.id == job_id
+    return (Job.id == job_id) & (Job.created_at == created_at)
+
+def _claimed_by(model):
+    # Side-table rows carry the job's created_at, so the join probes one partition
+    return (Job.id == model.job_id) & (Job.created_at == model.created_at)
+
+def _page(
+    query: Select,
+    status: Optional[JobStatus],
+    created_after: Optional[datetime],
+    created_before: Optional[datetime],
+    limit: int,
+    offset: int,
+    cursor: Optional[Tuple[datetime, str]],
+) -> Select:
+    if status:
+        query = query.where(Job.status == status)
+    if created_after:
+        query = query.where(Job.created_at >= created_after)
+    if created_before:
+        query = query.where(Job.created_at <= created_before)
+    if cursor:
+        # Keyset seek: served by ix_jobs_(status_)created_at_id without scanning skipped rows.
+        # The plain created_at bound lets the planner prune newer partitions.
+        query = query.where(
+            Job.created_at <= cursor[0], tuple_(Job.created_at, Job.id) < tuple_(*cursor)
+        )
+    else:
+        query = query.offset(offset)
+    return query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit)
 
 class JobsRepo:
     def __init__(self, session: AsyncSession):
@@ -14,12 +56,156 @@ class JobsRepo:
         await self.session.refresh(job)
         return job
 
+    async def create_idempotent(self, values: Dict[str, Any]) -> Optional[Job]:
+        """Insert a job, claiming its idempotency key and result key in the same transaction.
+
+        Returns None instead of inserting when another job already holds the same
+        idempotency key (job_idempotency_keys, so concurrent retries cannot both win)
+        or, for a memoized template, is already computing the same result_key
+        (job_result_leaders).
+        """
+        now = datetime.now(timezone.utc)
+        values = {"created_at": now, "updated_at": now, **values}
+        claim = {"job_id": values["id"], "created_at": values["created_at"]}
+        if values.get("idempotency_key") and not await self._claim(
+            JobIdempotencyKey, key=values["idempotency_key"], **claim
+        ):
+            await self.session.rollback()
+            return None
+        is_leader = (
+            values.get("result_key") is not None
+            and values.get("result_source_id") is None
+            and values.get("status", JobStatus.queued) in IN_FLIGHT_STATUSES
+        )
+        if is_leader and not await self._claim(
+            JobResultLeader, result_key=values["result_key"], **claim
+        ):
+            await self.session.rollback()
+            return None
+
+        result = await self.session.scalars(insert(Job).values(values).returning(Job))
+        job = result.one()
+        await self.session.commit()
+        return job
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> Sequence[Job]:
+        # One multi-row INSERT ... RETURNING instead of add/commit/refresh per job
+        # (chunked to stay under asyncpg's 32767 bind parameter limit).
+        # Rows whose idempotency key is already taken are skipped, not returned.
+        # Rows must carry created_at (the partition key, also stored with the key).
+        # Keys are claimed first, all of them in sorted order: concurrent batches
+        # sharing keys then take their row locks in the same order and cannot deadlock.
+        keys = sorted(
+            (
+                {"key": row["idempotency_key"], "job_id": row["id"], "created_at": row["created_at"]}
+                for row in rows if row.get("idempotency_key")
+            ),
+            key=lambda values: values["key"],
+        )
+        won = set()
+        for start in range(0, len(keys), INSERT_CHUNK_SIZE):
+            result = await self.session.scalars(
+                insert(JobIdempotencyKey)
+                .values(keys[start:start + INSERT_CHUNK_SIZE])
+                .on_conflict_do_nothing()
+                .returning(JobIdempotencyKey.job_id)
+            )
+            won.update(result.all())
+
+        rows = [row for row in rows if not row.get("idempotency_key") or row["id"] in won]
+        jobs: List[Job] = []
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            result = await self.session.scalars(
+                insert(Job).values(rows[start:start + INSERT_CHUNK_SIZE]).returning(Job)
+            )
+            jobs.extend(result.all())
+        await self.session.commit()
+        return jobs
+
+    async def _claim(self, model, **values: Any) -> bool:
+        # Primary-key insert that loses to a concurrent claim (it waits for that
+        # transaction, then conflicts) instead of raising
+        result = await self.session.execute(
+            insert(model).values(**values).on_conflict_do_nothing().returning(model.job_id)
+        )
+        return result.first() is not None
+
     async def get_by_id(self, job_id: str) -> Optional[Job]:
-        result = await self.session.execute(select(Job).where(Job.id == job_id))
+        result = await self.session.execute(
+            select(Job).where(_by_id(job_id)).execution_options(populate_existing=True)
+        )
         return result.scalar_one_or_none()
 
+    async def get_statuses(
+        self, ids: Sequence[str], since: Optional[datetime] = None
+    ) -> Sequence[Row]:
+        """(id, status, updated_at, completed_at, error_message) of the given jobs, in one query.
+
+        The ids travel as a single array parameter (`id = ANY(:ids)`), so the statement
+        is the same, and stays prepared, whatever the number of ids.
+        """
+        query = select(
+            Job.id, Job.status, Job.updated_at, Job.completed_at, Job.error_message
+        ).where(Job.id == any_(bindparam("ids", list(ids), type_=ARRAY(String))))
+        created = [job_created_at(job_id) for job_id in ids]
+        if created and None not in created:
+            # Only the partitions between the oldest and newest id are searched
+            query = query.where(Job.created_at.between(min(created), max(created)))
+        if since is not None:
+            query = query.where(Job.updated_at >= since)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def referenced_result_paths(self, paths: Sequence[str]) -> Set[str]:
+        """The given result_file_path values that some job still points at."""
+        result = await self.session.execute(
+            select(Job.result_file_path).distinct().where(
+                Job.result_file_path == any_(bindparam("paths", list(paths), type_=ARRAY(String)))
+            )
+        )
+        return set(result.scalars().all())
+
     async def get_by_idempotency_key(self, key: str) -> Optional[Job]:
-        result = await self.session.execute(select(Job).where(Job.idempotency_key == key))
+        result = await self.session.execute(
+            select(Job).join(JobIdempotencyKey, _claimed_by(JobIdempotencyKey)).where(
+                JobIdempotencyKey.key == key
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_by_idempotency_keys(self, keys: Sequence[str]) -> Sequence[Job]:
+        if not keys:
+            return []
+        result = await self.session.execute(
+            select(Job).join(JobIdempotencyKey, _claimed_by(JobIdempotencyKey)).where(
+                JobIdempotencyKey.key.in_(keys)
+            )
+        )
+        return result.scalars().all()
+
+    async def get_fresh_result(self, result_key: str, completed_after: datetime) -> Optional[Job]:
+        """Latest job that computed the artifact for `result_key` after `completed_after`."""
+        result = await self.session.execute(
+            select(Job)
+            .where(
+                Job.result_key == result_key,
+                Job.status == JobStatus.succeeded,
+                Job.result_source_id.is_(None),
+                Job.completed_at >= completed_after,
+            )
+            .order_by(Job.completed_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_inflight(self, result_key: str) -> Optional[Job]:
+        """The job holding `result_key` in job_result_leaders (it may have just finished)."""
+        result = await self.session.execute(
+            select(Job)
+            .join(JobResultLeader, _claimed_by(JobResultLeader))
+            .where(JobResultLeader.result_key == result_key)
+            .execution_options(populate_existing=True)
+        )
         return result.scalar_one_or_none()
 
     async def list_jobs(
@@ -29,20 +215,289 @@ class JobsRepo:
         created_before: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[Tuple[datetime, str]] = None,
     ) -> Sequence[Job]:
-        query = select(Job)
+        query = _page(select(Job), status, created_after, created_before, limit, offset, cursor)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def list_job_rows(
+        self,
+        fields: Sequence[str],
+        status: Optional[JobStatus] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[Tuple[datetime, str]] = None,
+    ) -> Sequence[Row]:
+        """Same page as `list_jobs`, as plain rows of `fields` (no ORM objects).
+
+        `id` and `created_at` are appended when not requested, for the next cursor.
+        """
+        names = list(fields) + [name for name in ("id", "created_at") if name not in fields]
+        query = select(*(getattr(Job, name) for name in names))
+        query = _page(query, status, created_after, created_before, limit, offset, cursor)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def count_by_status(self, statuses: Iterable[JobStatus]) -> Dict[JobStatus, int]:
+        # Filtered on the status index: counting only the (few) live statuses stays
+        # cheap however many finished jobs the partitions hold
+        result = await self.session.execute(
+            select(Job.status, func.count()).where(Job.status.in_(list(statuses))).group_by(Job.status)
+        )
+        return {status: count for status, count in result.all()}
+
+    async def stream_rows(
+        self,
+        status: Optional[JobStatus] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Row]:
+        """Yield plain job rows through a server-side cursor, `batch_size` at a time."""
+        query = select(
+            Job.id, Job.status, Job.template_name, Job.created_at, Job.started_at, Job.completed_at
+        )
         if status:
             query = query.where(Job.status == status)
         if created_after:
             query = query.where(Job.created_at >= created_after)
         if created_before:
             query = query.where(Job.created_at <= created_before)
-        
-        query = query.order_by(Job.created_at.desc()).limit(limit).offset(offset)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        query = query.order_by(Job.created_at, Job.id).limit(limit)
+
+        result = await self.session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
 
     async def update(self, job: Job) -> Job:
         await self.session.commit()
         await self.session.refresh(job)
         return job
+
+    async def claim(self, job_id: str, reclaim: bool = False) -> Optional[Job]:
+        """Atomically move a queued job to running.
+
+        Returns None if the job does not exist or another worker already owns it.
+        `reclaim` also accepts a job left running by an attempt that never finished
+        (Arq redelivery after a worker crash or timeout).
+        """
+        claimable = [JobStatus.queued, JobStatus.running] if reclaim else [JobStatus.queued]
+        now = datetime.now(timezone.utc)
+        return await self._transition(
+            job_id,
+            claimable,
+            status=JobStatus.running,
+            started_at=now,
+            updated_at=now,
+        )
+
+    async def complete(
+        self,
+        job_id: str,
+        result_file_path: str,
+        result_encoding: Optional[str] = None,
+        result_key: Optional[str] = None,
+    ) -> Optional[Job]:
+        now = datetime.now(timezone.utc)
+        values: Dict[str, Any] = {}
+        if result_key is not None:
+            # Makes the artifact reusable by later identical requests
+            values["result_key"] = result_key
+        return await self._transition(
+            job_id,
+            [JobStatus.running],
+            status=JobStatus.succeeded,
+            result_file_path=result_file_path,
+            result_encoding=result_encoding,
+            completed_at=now,
+            updated_at=now,
+            **values,
+        )
+
+    async def fail(self, job_id: str, error_message: str) -> Optional[Job]:
+        now = datetime.now(timezone.utc)
+        return await self._transition(
+            job_id,
+            [JobStatus.running],
+            status=JobStatus.failed,
+            error_message=error_message,
+            completed_at=now,
+            updated_at=now,
+        )
+
+    async def abandon(self, job_id: str, error_message: str) -> Optional[Job]:
+        """Fail a queued or running job no worker is going to finish."""
+        now = datetime.now(timezone.utc)
+        return await self._transition(
+            job_id,
+            IN_FLIGHT_STATUSES,
+            status=JobStatus.failed,
+            error_message=error_message,
+            completed_at=now,
+            updated_at=now,
+        )
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Move a queued or running job to cancelled; None if it already finished."""
+        now = datetime.now(timezone.utc)
+        return await self._transition(
+            job_id,
+            IN_FLIGHT_STATUSES,
+            status=JobStatus.cancelled,
+            completed_at=now,
+            updated_at=now,
+        )
+
+    async def detach(self, job_id: str) -> Optional[Job]:
+        """Turn a queued follower into a job computing its result itself."""
+        return await self._transition(
+            job_id,
+            [JobStatus.queued],
+            result_source_id=None,
+            updated_at=datetime.now(timezone.utc),
+        )
+
+    async def complete_from(
+        self, job_id: str, source: Job, from_statuses: Sequence[JobStatus] = (JobStatus.running,)
+    ) -> Optional[Job]:
+        """Succeed `job_id` with the artifact `source` computed (a result cache hit)."""
+        now = datetime.now(timezone.utc)
+        return await self._transition(
+            job_id,
+            list(from_statuses),
+            status=JobStatus.succeeded,
+            result_file_path=source.result_file_path,
+            result_encoding=source.result_encoding,
+            result_source_id=source.id,
+            started_at=func.coalesce(Job.started_at, now),
+            completed_at=now,
+            updated_at=now,
+        )
+
+    async def settle_followers(self, leader: Job, job_id: Optional[str] = None) -> Sequence[Job]:
+        """Give the queued jobs coalesced onto `leader` (or just `job_id`) its final outcome.
+
+        Returns the jobs that transitioned; the status check makes this safe to call
+        from both the worker finishing `leader` and an API process that attached a
+        follower just as `leader` finished.
+        """
+        now = datetime.now(timezone.utc)
+        values: Dict[str, Any] = dict(
+            status=leader.status, started_at=now, completed_at=now, updated_at=now
+        )
+        if leader.status == JobStatus.succeeded:
+            values.update(
+                result_file_path=leader.result_file_path, result_encoding=leader.result_encoding
+            )
+        else:
+            values.update(error_message=leader.error_message)
+        # The result key is free for the next computation once the outcome is shared
+        await self.session.execute(
+            delete(JobResultLeader).where(
+                JobResultLeader.result_key == leader.result_key,
+                JobResultLeader.job_id == leader.id,
+            )
+        )
+        # Followers are created after their leader: skip the older partitions
+        query = update(Job).where(
+            Job.result_source_id == leader.id,
+            Job.status == JobStatus.queued,
+            Job.created_at >= leader.created_at,
+        )
+        if job_id is not None:
+            query = query.where(_by_id(job_id))
+        result = await self.session.scalars(
+            query.values(**values)
+            .returning(Job)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        jobs = result.all()
+        await self.session.commit()
+        return jobs
+
+    async def release_leader(self, leader: Job) -> Optional[Job]:
+        """Hand the result key of a cancelled `leader` over to its oldest queued follower.
+
+        The follower becomes the job computing the result (and must be enqueued by the
+        caller), the other followers wait for it instead. Returns it, or None if
+        `leader` had no followers. Commits.
+        """
+        await self.session.execute(
+            delete(JobResultLeader).where(
+                JobResultLeader.result_key == leader.result_key,
+                JobResultLeader.job_id == leader.id,
+            )
+        )
+        followers = (
+            Job.result_source_id == leader.id,
+            Job.status == JobStatus.queued,
+            Job.created_at >= leader.created_at,
+        )
+        heir = await self.session.scalar(
+            select(Job)
+            .where(*followers)
+            .order_by(Job.created_at, Job.id)
+            .limit(1)
+            .with_for_update()
+        )
+        if heir is None:
+            await self.session.commit()
+            return None
+        self.session.add(
+            JobResultLeader(result_key=leader.result_key, job_id=heir.id, created_at=heir.created_at)
+        )
+        await self.session.execute(
+            update(Job)
+            .where(*followers, Job.id != heir.id)
+            .values(result_source_id=heir.id)
+            .execution_options(synchronize_session=False)
+        )
+        heir.result_source_id = None
+        heir.updated_at = datetime.now(timezone.utc)
+        await self.session.commit()
+        return heir
+
+    async def dispatch_due(self, until: datetime, limit: int) -> Sequence[Job]:
+        """Mark up to `limit` held jobs due by `until` as dispatched and return them.
+
+        Does not commit: the caller commits once the jobs are enqueued, or rolls back
+        to leave them held. SKIP LOCKED gives concurrent dispatchers disjoint batches.
+        """
+        due = (
+            select(Job.id, Job.created_at)
+            .where(Job.status == JobStatus.queued, Job.dispatched_at.is_(None), Job.run_at <= until)
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(
+            update(Job)
+            .where(tuple_(Job.id, Job.created_at).in_(due))
+            .values(dispatched_at=datetime.now(timezone.utc))
+            .returning(Job)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.all()
+
+    async def _transition(
+        self, job_id: str, from_statuses: List[JobStatus], **values: Any
+    ) -> Optional[Job]:
+        # Conditional UPDATE ... RETURNING: the status check and the write are one
+        # statement, so concurrent workers cannot both make the same transition.
+        result = await self.session.scalars(
+            update(Job)
+            .where(_by_id(job_id), Job.status.in_(from_statuses))
+            .values(**values)
+            .returning(Job)
+            # populate_existing: refresh a Job already loaded in this session (e.g. the
+            # one `claim` returned) instead of handing back its stale attributes
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        job = result.one_or_none()
+        await self.session.commit()
+        return job
@@ -0,0 +1,119 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, List, Optional
+from sqlalchemy import column, delete, func, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core_config import settings
+from backend.db.models import Job, JobIdempotencyKey, JobResultLeader
+
+PARTITION_PREFIX = "jobs_p"
+_PARTITION_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+# DROP TABLE needs an ACCESS EXCLUSIVE lock on jobs: give up (and retry on the next
+# run) rather than queue every other query on the table behind a long transaction
+DROP_LOCK_TIMEOUT = "5s"
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+class JobPartitionsRepo:
+    """Daily range partitions of the jobs table (one per UTC day of created_at)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def ensure_partitions(self, first_day: date, last_day: date):
+        """Create the missing partitions for first_day..last_day (inclusive) and commit."""
+        day = first_day
+        while day <= last_day:
+            await self.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF jobs "
+                f"FOR VALUES FROM ('{day_start(day).isoformat()}') "
+                f"TO ('{day_start(day + timedelta(days=1)).isoformat()}')"
+            ))
+            day += timedelta(days=1)
+        await self.session.commit()
+
+    async def ensure_upcoming(self, days: int = settings.JOB_PARTITION_PREMAKE_DAYS):
+        """Create the missing partitions for today and the next `days` days and commit."""
+        today = datetime.now(timezone.utc).date()
+        await self.ensure_partitions(today, today + timedelta(days=days))
+
+    async def list_partitions(self) -> List[date]:
+        result = await self.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'jobs'::regclass"
+        ))
+        days = []
+        for name in result.scalars():
+            match = _PARTITION_NAME.match(name)
+            if match:
+                days.append(datetime.strptime(match.group(1), "%Y%m%d").date())
+        return sorted(days)
+
+    async def expired_partitions(self, cutoff: datetime) -> List[date]:
+        """Partitions holding only jobs created before `cutoff`, oldest first."""
+        return [
+            day for day in await self.list_partitions()
+            if day_start(day + timedelta(days=1)) <= cutoff
+        ]
+
+    async def unreferenced_result_paths(self, day: date, batch_size: int = 1000) -> AsyncIterator[List[str]]:
+        """Result files of one day that no newer job references, `batch_size` at a time.
+
+        Keyset-paged over the result_file_path index, one short transaction per batch,
+        so memory stays bounded by the batch whatever the day holds. Nothing inserts
+        into a past day, so the partition is read without locking it.
+        """
+        partition = table(partition_name(day), column("result_file_path"))
+        upper = day_start(day + timedelta(days=1))
+        after: Optional[str] = None
+        while True:
+            query = select(partition.c.result_file_path).distinct().where(
+                partition.c.result_file_path.isnot(None)
+            )
+            if after is not None:
+                query = query.where(partition.c.result_file_path > after)
+            result = await self.session.execute(
+                query.order_by(partition.c.result_file_path).limit(batch_size)
+            )
+            candidates = list(result.scalars())
+            if not candidates:
+                await self.session.commit()
+                return
+            after = candidates[-1]
+            # Memoized results are shared: newer jobs may point at an artifact computed here
+            result = await self.session.execute(
+                select(Job.result_file_path).distinct().where(
+                    Job.result_file_path.in_(candidates),
+                    Job.created_at >= upper,
+                )
+            )
+            referenced = set(result.scalars())
+            await self.session.commit()
+            yield [path for path in candidates if path not in referenced]
+            if len(candidates) < batch_size:
+                return
+
+    async def drop_partition(self, day: date) -> int:
+        """Drop one day of jobs and commit; returns the number of jobs dropped.
+
+        Remove its result files first (unreferenced_result_paths): once the partition
+        is gone nothing records them.
+        """
+        upper = day_start(day + timedelta(days=1))
+        row_count = await self.session.scalar(
+            select(func.count()).select_from(table(partition_name(day)))
+        )
+        await self.session.execute(text(f"SET LOCAL lock_timeout = '{DROP_LOCK_TIMEOUT}'"))
+        await self.session.execute(text(f"DROP TABLE {partition_name(day)}"))
+        await self.session.execute(
+            delete(JobIdempotencyKey).where(JobIdempotencyKey.created_at < upper)
+        )
+        await self.session.execute(
+            delete(JobResultLeader).where(JobResultLeader.created_at < upper)
+        )
+        await self.session.commit()
+        return row_count
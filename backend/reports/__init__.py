@@ -0,0 +1,11 @@
+from backend.reports.registry import (
+    EXECUTION_MODES,
+    TEMPLATES,
+    ReportContext,
+    ReportTemplate,
+    get_template,
+    register_template,
+)
+from backend.reports import templates  # noqa: F401  (registers the built-in templates)
+
+__all__ = ["EXECUTION_MODES", "TEMPLATES", "ReportContext", "ReportTemplate", "get_template", "register_template"]
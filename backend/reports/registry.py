@@ -0,0 +1,98 @@
+import hashlib
+import inspect
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Optional, Sequence, Type, Union
+from pydantic import BaseModel
+from backend.core_config import settings
+from backend.db.models import Job
+
+Row = Sequence[Any]
+RowSource = Union[Iterable[Row], AsyncIterable[Row]]
+
+# Where a template's rows are generated and written:
+#   inline  - on the worker's event loop (only for trivial templates)
+#   thread  - on a thread; async generators always produce on the loop and write on a thread
+#   process - in the worker's process pool (CPU-bound sync generators)
+EXECUTION_MODES = ("inline", "thread", "process")
+
+
+@dataclass(frozen=True)
+class ReportContext:
+    # A JobRead snapshot instead when the template runs in a pool process
+    job: Job
+    # Validated `params` model of the template, or None if it takes no parameters
+    params: Optional[BaseModel]
+
+
+@dataclass(frozen=True)
+class ReportTemplate:
+    name: str
+    header: Sequence[str]
+    # Generator or async generator of rows; consumed in batches by backend.reports.writer
+    rows: Callable[[ReportContext], RowSource]
+    # Pydantic model validating Job.metadata_info
+    params: Optional[Type[BaseModel]] = None
+    execution: str = "thread"
+    # Bump when the output for the same params changes; part of the result cache key
+    version: int = 1
+    # Seconds a computed artifact may be reused by identical requests (None: never;
+    # templates whose rows depend on the job itself must not be cached)
+    cache_ttl: Optional[float] = None
+
+    @property
+    def timeout(self) -> float:
+        """Seconds a render may run (TEMPLATE_TIMEOUTS, else JOB_TIMEOUT_SECONDS)."""
+        return settings.TEMPLATE_TIMEOUTS.get(self.name, settings.JOB_TIMEOUT_SECONDS)
+
+    def parse_params(self, metadata_info: Optional[Dict[str, Any]]) -> Optional[BaseModel]:
+        if self.params is None:
+            return None
+        return self.params.model_validate(metadata_info or {})
+
+    def cache_key(self, metadata_info: Optional[Dict[str, Any]]) -> str:
+        """Stable hash of name, version and the validated params (defaults filled in,
+        key order and value formatting normalised by the params model)."""
+        params = self.parse_params(metadata_info)
+        canonical = params.model_dump(mode="json") if params is not None else None
+        raw = json.dumps([self.name, self.version, canonical], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+TEMPLATES: Dict[str, ReportTemplate] = {}
+
+
+def register_template(
+    name: str,
+    header: Sequence[str],
+    params: Optional[Type[BaseModel]] = None,
+    execution: str = "thread",
+    version: int = 1,
+    cache_ttl: Optional[float] = None,
+) -> Callable[[Callable[[ReportContext], RowSource]], Callable[[ReportContext], RowSource]]:
+    if execution not in EXECUTION_MODES:
+        raise ValueError(f"execution must be one of {EXECUTION_MODES}, got {execution!r}")
+
+    def decorator(rows: Callable[[ReportContext], RowSource]):
+        if name in TEMPLATES:
+            raise ValueError(f"Report template {name!r} is already registered")
+        if execution == "process" and inspect.isasyncgenfunction(rows):
+            raise ValueError(f"Report template {name!r}: async generators cannot run in a process")
+        TEMPLATES[name] = ReportTemplate(
+            name=name,
+            header=tuple(header),
+            rows=rows,
+            params=params,
+            execution=execution,
+            version=version,
+            cache_ttl=cache_ttl,
+        )
+        return rows
+    return decorator
+
+
+def get_template(name: str) -> ReportTemplate:
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown report template {name!r}") from None
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+from backend.core_config import settings
+from backend.db.models import JobStatus
+from backend.db.session import SessionLocal
+from backend.reports.registry import ReportContext, register_template
+from backend.repo.jobs import JobsRepo
+
+
+@register_template("report_v1", header=["Job ID", "Created At", "Template"], execution="inline")
+def report_v1(ctx: ReportContext):
+    job = ctx.job
+    yield [job.id, job.created_at.isoformat(), job.template_name]
+
+
+class JobsExportParams(BaseModel):
+    status: Optional[JobStatus] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    limit: Optional[int] = Field(None, ge=1)
+
+
+@register_template(
+    "jobs_export_v1",
+    header=["Job ID", "Status", "Template", "Created At", "Started At", "Completed At"],
+    params=JobsExportParams,
+    # Identical exports within a few minutes share one file
+    cache_ttl=300,
+)
+async def jobs_export_v1(ctx: ReportContext):
+    """Export a slice of the jobs table; streamed, so RSS does not grow with its size."""
+    params: JobsExportParams = ctx.params
+    async with SessionLocal() as session:
+        repo = JobsRepo(session)
+        async for row in repo.stream_rows(
+            status=params.status,
+            created_after=params.created_after,
+            created_before=params.created_before,
+            limit=params.limit,
+            batch_size=settings.REPORT_ROW_BATCH_SIZE,
+        ):
+            yield [
+                row.id,
+                row.status.value,
+                row.template_name,
+                row.created_at.isoformat(),
+                row.started_at.isoformat() if row.started_at else "",
+                row.completed_at.isoformat() if row.completed_at else "",
+            ]
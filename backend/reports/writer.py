@@ -0,0 +1,142 @@
+import asyncio
+import csv
+import os
+from concurrent.futures import Executor
+from threading import Event
+from typing import AsyncIterable, Iterable, List, Optional, Sequence
+from backend.compression import open_text_writer
+from backend.core_config import settings
+from backend.db.models import Job
+from backend.domain.jobs import JobRead
+from backend.reports.registry import ReportContext, ReportTemplate, Row, get_template
+
+
+class RenderStopped(Exception):
+    """The render's stop event was set (job cancelled or past its deadline)."""
+
+
+def _check_stop(stop: Optional[Event]):
+    # Checked once per row batch: a batch is the unit of work a stop can interrupt
+    if stop is not None and stop.is_set():
+        raise RenderStopped
+
+
+def _write_sync_rows(
+    path: str,
+    encoding: Optional[str],
+    header: Sequence[str],
+    rows: Iterable[Row],
+    stop: Optional[Event] = None,
+) -> int:
+    # Plain generators run entirely on the worker thread, generation included
+    count = 0
+    with open_text_writer(path, encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        batch: List[Row] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= settings.REPORT_ROW_BATCH_SIZE:
+                _check_stop(stop)
+                writer.writerows(batch)
+                count += len(batch)
+                batch = []
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+async def _write_async_rows(
+    path: str,
+    encoding: Optional[str],
+    header: Sequence[str],
+    rows: AsyncIterable[Row],
+    stop: Optional[Event] = None,
+) -> int:
+    # Rows are produced on the loop (typically awaiting a DB cursor) while the previous
+    # batch is formatted and written on a thread: at most two batches are in memory.
+    loop = asyncio.get_running_loop()
+    # (compression, when enabled, happens on the same thread as the writes)
+    f = await loop.run_in_executor(None, open_text_writer, path, encoding)
+    count = 0
+    pending: Optional[asyncio.Future] = None
+    try:
+        writer = csv.writer(f)
+        await loop.run_in_executor(None, writer.writerow, header)
+        batch: List[Row] = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= settings.REPORT_ROW_BATCH_SIZE:
+                _check_stop(stop)
+                if pending is not None:
+                    await pending
+                pending = loop.run_in_executor(None, writer.writerows, batch)
+                count += len(batch)
+                batch = []
+        if pending is not None:
+            await pending
+            pending = None
+        await loop.run_in_executor(None, writer.writerows, batch)
+        count += len(batch)
+    finally:
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+        await loop.run_in_executor(None, f.close)
+        # Release the template's DB cursor/session promptly if we stopped early
+        aclose = getattr(rows, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    return count
+
+
+def _render_in_process(
+    template_name: str, job: JobRead, path: str, encoding: Optional[str], stop: Optional[Event]
+) -> int:
+    # Runs in a pool process: the registry is rebuilt (or inherited) there, only names
+    # and a pydantic snapshot of the job cross the process boundary (`stop` is then a
+    # multiprocessing.Manager Event proxy).
+    template = get_template(template_name)
+    ctx = ReportContext(job=job, params=template.parse_params(job.metadata_info))
+    return _write_sync_rows(path, encoding, template.header, template.rows(ctx), stop)
+
+
+async def write_report(
+    template: ReportTemplate,
+    job: Job,
+    file_path: str,
+    encoding: Optional[str] = None,
+    process_pool: Optional[Executor] = None,
+    stop: Optional[Event] = None,
+) -> int:
+    """Render `template` for `job` into `file_path` as CSV; returns the row count.
+
+    `encoding` ("gzip" / "zstd") compresses the file as it is written.
+    "process" templates run in `process_pool` (thread mode if none is given).
+    Once `stop` is set, the render raises RenderStopped before its next row batch.
+    The file appears under its final name only once it is complete.
+    """
+    tmp_path = f"{file_path}.tmp"
+    try:
+        if template.execution == "process" and process_pool is not None:
+            loop = asyncio.get_running_loop()
+            count = await loop.run_in_executor(
+                process_pool, _render_in_process,
+                template.name, JobRead.model_validate(job), tmp_path, encoding, stop,
+            )
+        else:
+            ctx = ReportContext(job=job, params=template.parse_params(job.metadata_info))
+            rows = template.rows(ctx)
+            if hasattr(rows, "__aiter__"):
+                count = await _write_async_rows(tmp_path, encoding, template.header, rows, stop)
+            elif template.execution == "inline":
+                count = _write_sync_rows(tmp_path, encoding, template.header, rows, stop)
+            else:
+                count = await asyncio.to_thread(
+                    _write_sync_rows, tmp_path, encoding, template.header, rows, stop
+                )
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
@@ -0,0 +1,100 @@
+import asyncio
+from contextlib import contextmanager, suppress
+from typing import Dict, Iterator, Optional, Set
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from backend.logger import logger
+from backend.services.status_cache import JOB_EVENTS_CHANNEL, CachedStatus, decode_job_event
+
+
+class JobWaiter:
+    """One parked SSE stream or long-poll request for a job."""
+
+    __slots__ = ("job_id", "entry", "_changed")
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        # Latest state seen on the channel; None after a resync (re-read the cache)
+        self.entry: Optional[CachedStatus] = None
+        self._changed = asyncio.Event()
+
+    def notify(self, entry: Optional[CachedStatus]):
+        self.entry = entry
+        self._changed.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for the next notification; False if `timeout` elapsed first."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+
+class JobEventHub:
+    """Fans out job status events to in-memory waiters.
+
+    Each API process holds a single Redis pub/sub connection, however many clients
+    are waiting; a waiter costs one small object and an asyncio.Event.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._waiters: Dict[str, Set[JobWaiter]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+
+    @property
+    def waiter_count(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[JobWaiter]:
+        # Subscribe before reading the current state so no transition is missed
+        waiter = JobWaiter(job_id)
+        self._waiters.setdefault(job_id, set()).add(waiter)
+        try:
+            yield waiter
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    def _dispatch(self, raw: bytes):
+        job_id, entry = decode_job_event(raw)
+        for waiter in self._waiters.get(job_id, ()):
+            waiter.notify(entry)
+
+    def _resync(self):
+        # Events may have been lost while disconnected: make every waiter re-read
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                waiter.notify(None)
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                self._resync()
+                async for message in pubsub.listen():
+                    try:
+                        self._dispatch(message["data"])
+                    except ValueError as e:
+                        logger.warning("job_event_malformed", error=str(e))
+            except RedisError as e:
+                logger.warning("job_events_listener_failed", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
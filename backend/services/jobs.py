@@ -1,49 +1,278 @@
-import uuid
-from datetime import datetime, timezone
-from typing import Optional
-from arq import create_pool
-from arq.connections import RedisSettings
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+from arq.constants import expires_extra_ms
+from backend.cache import TTLCache
 from backend.core_config import settings
-from backend.db.models import Job
-from backend.domain.jobs import JobCreate
+from backend.db.models import TERMINAL_STATUSES, Job, JobStatus
+from backend.domain.jobs import JobBatchItem, JobCreate, JobRead
+from backend.ids import job_created_at, new_job_id
+from backend.metrics import CANCELLED_SAVED_WORKER_SECONDS, JOBS_CANCELLED, RESULT_CACHE_REQUESTS
+from backend.reports import TEMPLATES
 from backend.repo.jobs import JobsRepo
+from backend.services.queue import JobQueue, QueuedJob
+from backend.services.run_estimates import expected_run_seconds
 from fastapi import HTTPException
 
+# Idempotency key -> job created by this process
+idempotency_cache: TTLCache[JobRead] = TTLCache(
+    settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_CACHE_TTL_SECONDS
+)
+
+def held_by_scheduler(run_at: Optional[datetime], now: datetime) -> bool:
+    # Far-future jobs are not written to Redis until dispatch_scheduled_jobs picks them up
+    return run_at is not None and run_at > now + timedelta(seconds=settings.SCHEDULER_HORIZON_SECONDS)
+
+def leader_abandoned(leader: Job, now: datetime) -> bool:
+    """True if no worker will finish `leader`, so its result key must not stay held.
+
+    Running past its template timeout plus the grace period means Arq's own
+    job_timeout or a crash ended the attempt without a final status; queued for
+    longer than Arq keeps a job key means its task expired without running.
+    """
+    if leader.status == JobStatus.running and leader.started_at is not None:
+        limit = TEMPLATES[leader.template_name].timeout + settings.JOB_TIMEOUT_GRACE_SECONDS
+        return leader.started_at < now - timedelta(seconds=limit)
+    if leader.status == JobStatus.queued:
+        return leader.created_at < now - timedelta(milliseconds=expires_extra_ms)
+    return False
+
 class JobsService:
-    def __init__(self, repo: JobsRepo):
+    def __init__(self, repo: JobsRepo, queue: JobQueue):
         self.repo = repo
+        self.queue = queue
 
     async def create_job(
-        self, job_in: JobCreate, idempotency_key: Optional[str] = None
-    ) -> Job:
-        # Check idempotency
+        self,
+        job_in: JobCreate,
+        idempotency_key: Optional[str] = None,
+        client_id: Optional[str] = None,
+    ) -> Union[Job, JobRead]:
+        # Retry storms for a key this process just created are answered from memory
         if idempotency_key:
-            existing_job = await self.repo.get_by_idempotency_key(idempotency_key)
-            if existing_job:
-                return existing_job
+            cached = idempotency_cache.get(idempotency_key)
+            if cached is not None:
+                return cached
 
-        # Validate run_at
+        # Validate run_at (a retry of an accepted job still gets that job back)
         if job_in.run_at and job_in.run_at < datetime.now(timezone.utc):
+            existing_job = None
+            if idempotency_key:
+                existing_job = await self.repo.get_by_idempotency_key(idempotency_key)
+            if existing_job:
+                return existing_job
             raise HTTPException(status_code=400, detail="run_at cannot be in the past")
 
-        job_id = str(uuid.uuid4())
-        job = Job(
-            id=job_id,
-            idempotency_key=idempotency_key,
-            template_name=job_in.template_name,
-            metadata_info=job_in.metadata_info,
-            run_at=job_in.run_at,
-        )
-        
-        created_job = await self.repo.create(job)
-        
-        # Enqueue task
-        await self.enqueue_job_task(created_job.id, created_job.run_at)
-        
-        return created_job
-
-    async def enqueue_job_task(self, job_id: str, run_at: Optional[datetime] = None):
-        redis = await create_pool(RedisSettings(host=settings.REDIS_HOST, port=settings.REDIS_PORT))
-        # _defer_until expects a datetime object (naive or aware)
-        await redis.enqueue_job('process_job', job_id, _defer_until=run_at)
-        await redis.aclose()
+        now = datetime.now(timezone.utc)
+        held = held_by_scheduler(job_in.run_at, now)
+        job_id = new_job_id(now)
+        values = {
+            "id": job_id,
+            "created_at": job_created_at(job_id),
+            "idempotency_key": idempotency_key,
+            "template_name": job_in.template_name,
+            "metadata_info": job_in.metadata_info,
+            "run_at": job_in.run_at,
+            "priority": job_in.priority,
+            "client_id": client_id,
+            "dispatched_at": None if held else now,
+        }
+        template = TEMPLATES[job_in.template_name]
+        if settings.RESULT_CACHE_ENABLED and template.cache_ttl and not job_in.run_at:
+            values["result_key"] = template.cache_key(job_in.metadata_info)
+            job = await self._create_memoized(values, template.cache_ttl)
+        else:
+            job = await self.repo.create_idempotent(values)
+
+        if job is None:
+            # Key already taken (possibly by a concurrent request): return its job, do not enqueue
+            job = await self.repo.get_by_idempotency_key(idempotency_key)
+        elif job.status == JobStatus.queued and job.result_source_id is None and not held:
+            # Enqueue task (cache hits are already final, followers wait for their source,
+            # far-future jobs for the scheduler)
+            await self.enqueue_job_task(job)
+
+        if idempotency_key:
+            idempotency_cache.set(idempotency_key, JobRead.model_validate(job))
+        return job
+
+    async def _create_memoized(self, values: Dict[str, Any], cache_ttl: float) -> Optional[Job]:
+        """Insert a job of a memoized template as a cache hit, a follower of an identical
+        in-flight job, or the job computing the result. None if the idempotency key is taken.
+        """
+        result_key = values["result_key"]
+        # Each retry means a concurrent identical job finished between two statements
+        for _ in range(3):
+            now = datetime.now(timezone.utc)
+            source = await self.repo.get_fresh_result(result_key, now - timedelta(seconds=cache_ttl))
+            if source is not None:
+                job = await self.repo.create_idempotent({
+                    **values,
+                    "status": JobStatus.succeeded,
+                    "result_file_path": source.result_file_path,
+                    "result_encoding": source.result_encoding,
+                    "result_source_id": source.id,
+                    "started_at": now,
+                    "completed_at": now,
+                })
+                if job is not None:
+                    RESULT_CACHE_REQUESTS.labels(result="hit").inc()
+                return job
+
+            job = await self.repo.create_idempotent(values)
+            if job is not None:
+                RESULT_CACHE_REQUESTS.labels(result="miss").inc()
+                return job
+            idempotency_key = values["idempotency_key"]
+            if idempotency_key and await self.repo.get_by_idempotency_key(idempotency_key):
+                return None
+
+            # job_result_leaders: an identical job is queued or running
+            leader = await self.repo.get_inflight(result_key)
+            if leader is None:
+                continue
+            if leader_abandoned(leader, now):
+                await self._take_over(leader)
+                continue
+            job = await self.repo.create_idempotent({**values, "result_source_id": leader.id})
+            if job is None:
+                return None
+            RESULT_CACHE_REQUESTS.labels(result="coalesced").inc()
+            # The leader may have finished (and settled its followers) before this row
+            # was committed: settle it here in that case
+            leader = await self.repo.get_by_id(leader.id)
+            if leader is not None and leader.status == JobStatus.cancelled:
+                # Its followers were handed to another job before this row was committed:
+                # compute the result independently
+                job = await self.repo.detach(job.id) or job
+            elif leader is not None and leader.status in TERMINAL_STATUSES:
+                settled = await self.repo.settle_followers(leader, job.id)
+                if settled:
+                    job = settled[0]
+            return job
+        return await self.repo.create_idempotent({**values, "result_key": None})
+
+    async def _take_over(self, leader: Job):
+        # Whoever fails the abandoned leader hands its followers to the oldest of them
+        # (enqueued here); the key is then held by that job, or free
+        abandoned = await self.repo.abandon(leader.id, "Abandoned: no worker finished it")
+        if abandoned is None:
+            return
+        heir = await self.repo.release_leader(abandoned)
+        if heir is not None:
+            await self.enqueue_job_task(heir)
+
+    async def create_jobs(
+        self, items: List[JobBatchItem], client_id: Optional[str] = None
+    ) -> List[Tuple[Job, bool]]:
+        """Create many jobs with one INSERT ... ON CONFLICT and one enqueue pipeline.
+
+        Returns (job, deduplicated) pairs in the same order as `items`.
+        """
+        now = datetime.now(timezone.utc)
+        for index, item in enumerate(items):
+            if item.run_at and item.run_at < now:
+                raise HTTPException(
+                    status_code=400, detail=f"items[{index}]: run_at cannot be in the past"
+                )
+
+        # Items repeating a key earlier in this batch resolve to the same job
+        rows = []
+        planned = []
+        claimed_keys = {}
+        for item in items:
+            key = item.idempotency_key
+            if key and key in claimed_keys:
+                planned.append((claimed_keys[key], key))
+                continue
+            job_id = new_job_id(now)
+            if key:
+                claimed_keys[key] = job_id
+            rows.append({
+                "id": job_id,
+                "idempotency_key": key,
+                "status": JobStatus.queued,
+                "template_name": item.template_name,
+                "metadata_info": item.metadata_info,
+                "run_at": item.run_at,
+                "priority": item.priority,
+                "client_id": client_id,
+                "dispatched_at": None if held_by_scheduler(item.run_at, now) else now,
+                "created_at": job_created_at(job_id),
+                "updated_at": now,
+            })
+            planned.append((job_id, key))
+
+        created = await self.repo.create_many(rows)
+        await self.queue.enqueue_many([
+            QueuedJob(job.id, job.run_at, job.priority, job.client_id)
+            for job in created if job.dispatched_at is not None
+        ])
+
+        created_by_id = {job.id: job for job in created}
+        # Keys that were already stored: their rows were skipped by ON CONFLICT
+        skipped_keys = [
+            key for key, job_id in claimed_keys.items() if job_id not in created_by_id
+        ]
+        existing_by_key = {
+            job.idempotency_key: job
+            for job in await self.repo.get_by_idempotency_keys(skipped_keys)
+        }
+
+        results = []
+        seen = set()
+        for job_id, key in planned:
+            if job_id in created_by_id:
+                results.append((created_by_id[job_id], job_id in seen))
+                seen.add(job_id)
+            else:
+                results.append((existing_by_key[key], True))
+        return results
+
+    async def cancel_job(self, job_id: str) -> Tuple[Job, Optional[Job]]:
+        """Cancel a queued or running job.
+
+        A queued job is removed from its Arq lane; a running one is stopped by its
+        worker at the next row batch (it watches the status event published for it).
+        Jobs coalesced onto a cancelled job are handed over to the oldest of them,
+        which is enqueued and returned alongside the cancelled job.
+        """
+        job = await self.repo.get_by_id(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        stage = job.status
+        cancelled = await self.repo.cancel(job_id) if stage not in TERMINAL_STATUSES else None
+        if cancelled is None:
+            # Finished first (possibly while this request was running)
+            job = await self.repo.get_by_id(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job not found")
+            raise HTTPException(status_code=409, detail=f"Job is already {job.status.value}")
+
+        if stage == JobStatus.queued and cancelled.dispatched_at and cancelled.result_source_id is None:
+            await self.queue.abort(cancelled.id, cancelled.priority)
+        JOBS_CANCELLED.labels(template=cancelled.template_name, stage=stage.value).inc()
+        await self._record_saved_time(cancelled, stage, job.started_at)
+
+        heir = None
+        if cancelled.result_key is not None and cancelled.result_source_id is None:
+            heir = await self.repo.release_leader(cancelled)
+            if heir is not None:
+                await self.enqueue_job_task(heir)
+        return cancelled, heir
+
+    async def _record_saved_time(self, cancelled: Job, stage: JobStatus, started_at: Optional[datetime]):
+        # Followers and cache hits never rendered anything themselves
+        if cancelled.result_source_id is not None:
+            return
+        expected = await expected_run_seconds(self.queue.redis, cancelled.template_name)
+        if expected is None:
+            return
+        elapsed = 0.0
+        if stage == JobStatus.running and started_at is not None:
+            elapsed = (cancelled.completed_at - started_at).total_seconds()
+        CANCELLED_SAVED_WORKER_SECONDS.labels(
+            template=cancelled.template_name, stage=stage.value
+        ).inc(max(0.0, expected - elapsed))
+
+    async def enqueue_job_task(self, job: Job):
+        await self.queue.enqueue(job.id, job.run_at, job.priority, job.client_id)
@@ -0,0 +1,269 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from arq.constants import default_queue_name, job_key_prefix
+from arq.jobs import serialize_job
+from arq.utils import timestamp_ms, to_unix_ms
+from redis.asyncio import Redis
+from backend.core_config import settings
+from backend.db.models import JobPriority
+from backend.metrics import ENQUEUE_DURATION
+
+PROCESS_JOB_TASK = "process_job"
+
+# Fair queueing state: lane -> virtual time (start tag of the latest job a worker
+# picked up), and per lane: client -> finish tag of its latest enqueued job
+FAIR_VTIME_KEY = "jobs:fair:vtime"
+FAIR_TAGS_KEY_PREFIX = "jobs:fair:tags:"
+# Jobs without X-Client-Id share one fair-queueing slot
+ANONYMOUS_CLIENT = "-"
+# Fair-queued scores are small virtual tags; deferred (run_at) scores and Arq's own
+# retry scores are epoch ms, which are all above this (2001-09-09).
+VIRTUAL_SCORE_LIMIT = 10 ** 12
+# Deferred job id -> client id, until promote_due gives the job its start tag
+FAIR_DEFERRED_CLIENTS_KEY = "jobs:fair:deferred-clients"
+# Ids of the jobs Arq's scheduler enqueues for cron functions ("cron:<name>:<ms>")
+CRON_JOB_PREFIX = "cron:"
+
+
+def get_redis_settings() -> RedisSettings:
+    return RedisSettings(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        max_connections=settings.REDIS_POOL_SIZE,
+    )
+
+
+def lane_queue_name(priority: JobPriority) -> str:
+    # "normal" keeps Arq's default queue, so tasks queued before lanes existed still drain
+    if priority == JobPriority.normal:
+        return default_queue_name
+    return f"{default_queue_name}:{priority.value}"
+
+
+async def advance_virtual_time(redis: Redis, priority: JobPriority, score: Optional[int]):
+    """Called by the worker when it starts a job: move the lane's clock to its tag."""
+    if score and score < VIRTUAL_SCORE_LIMIT:
+        await redis.zadd(FAIR_VTIME_KEY, {priority.value: score}, gt=True)
+
+
+async def warm_redis(redis: Redis, connections: int = settings.POOL_PREWARM_CONNECTIONS):
+    """Open `connections` pooled Redis connections now and leave them idle in the pool."""
+    pool = redis.connection_pool
+    # Checked out together, so each one is a separate (newly connected) connection
+    checked_out = []
+    try:
+        for _ in range(connections):
+            checked_out.append(await pool.get_connection("PING"))
+    finally:
+        for connection in checked_out:
+            await pool.release(connection)
+
+
+class QueuedJob(NamedTuple):
+    job_id: str
+    run_at: Optional[datetime] = None
+    priority: JobPriority = JobPriority.normal
+    client_id: Optional[str] = None
+
+
+class JobQueue:
+    """Enqueues `process_job` tasks through one shared Arq pool.
+
+    Calls to `enqueue` that arrive within `batch_window_ms` of each other are
+    written to Redis in a single MULTI/EXEC pipeline instead of one round trip each.
+    The platform job id doubles as the Arq job id, so re-enqueueing is a no-op.
+
+    Each priority has its own Arq queue. Within a queue, jobs that are due now are
+    ordered by start-time fair queueing per client instead of by enqueue time: a
+    client's n-th waiting job is scored n tags after the lane's virtual time, so a
+    50k-job backfill from one client interleaves with other clients' jobs instead
+    of running ahead of them. Deferred jobs wait under their run_at score and are
+    re-scored with a start tag once due (promote_due, run by the worker): left at
+    an epoch-ms score they would sort behind every tagged job, and Arq only looks at
+    the lowest 100 due scores per poll.
+    """
+
+    def __init__(
+        self,
+        redis: ArqRedis,
+        batch_window_ms: float = settings.ENQUEUE_BATCH_WINDOW_MS,
+        max_batch_size: int = settings.ENQUEUE_BATCH_MAX_SIZE,
+    ):
+        self.redis = redis
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[QueuedJob, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    @classmethod
+    async def connect(cls) -> "JobQueue":
+        redis = await create_pool(get_redis_settings())
+        return cls(redis)
+
+    async def close(self):
+        self._start_flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.redis.aclose()
+
+    async def enqueue(
+        self,
+        job_id: str,
+        run_at: Optional[datetime] = None,
+        priority: JobPriority = JobPriority.normal,
+        client_id: Optional[str] = None,
+    ):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((QueuedJob(job_id, run_at, priority, client_id), fut))
+        if len(self._pending) >= self.max_batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self._start_flush)
+        await fut
+
+    async def enqueue_many(self, items: Sequence[QueuedJob]):
+        for start in range(0, len(items), self.max_batch_size):
+            await self._write(items[start:start + self.max_batch_size])
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, batch: List[Tuple[QueuedJob, asyncio.Future]]):
+        try:
+            await self._write([item for item, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_result(None)
+
+    async def _fair_scores(self, items: Sequence[QueuedJob], now_ms: int) -> List[Optional[int]]:
+        # Start tags for the items that are due at now_ms (None for deferred ones).
+        # Raising a client's finish tag to the lane clock first means an idle client
+        # starts at "now" instead of banking credit; ZINCRBY then reserves one tag per job.
+        groups: Dict[Tuple[JobPriority, str], List[int]] = defaultdict(list)
+        for index, item in enumerate(items):
+            if item.run_at is None or to_unix_ms(item.run_at) <= now_ms:
+                groups[item.priority, item.client_id or ANONYMOUS_CLIENT].append(index)
+        scores: List[Optional[int]] = [None] * len(items)
+        if not groups:
+            return scores
+
+        lanes = sorted({priority for priority, _ in groups})
+        vtimes = dict(zip(lanes, await self.redis.zmscore(FAIR_VTIME_KEY, [p.value for p in lanes])))
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for (priority, client), indexes in groups.items():
+                key = FAIR_TAGS_KEY_PREFIX + priority.value
+                pipe.zadd(key, {client: vtimes[priority] or 0}, gt=True)
+                pipe.zincrby(key, len(indexes), client)
+            finish_tags = (await pipe.execute())[1::2]
+
+        for indexes, finish in zip(groups.values(), finish_tags):
+            first = int(finish) - len(indexes) + 1
+            for offset, index in enumerate(indexes):
+                scores[index] = first + offset
+        return scores
+
+    async def _write(self, items: Sequence[QueuedJob]):
+        # Same keys as ArqRedis.enqueue_job, minus the per-job WATCH round trip:
+        # SET NX / ZADD NX keep enqueueing an existing job id a no-op.
+        started = time.perf_counter()
+        enqueue_time_ms = timestamp_ms()
+        scores = await self._fair_scores(items, enqueue_time_ms)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for item, score in zip(items, scores):
+                if score is None:
+                    # _defer_until expects a datetime object (naive or aware)
+                    score = to_unix_ms(item.run_at)
+                    expires_ms = score - enqueue_time_ms + self.redis.expires_extra_ms
+                    pipe.hset(FAIR_DEFERRED_CLIENTS_KEY, item.job_id, item.client_id or ANONYMOUS_CLIENT)
+                else:
+                    expires_ms = self.redis.expires_extra_ms
+                job = serialize_job(
+                    PROCESS_JOB_TASK, (item.job_id,), {}, None, enqueue_time_ms,
+                    serializer=self.redis.job_serializer,
+                )
+                pipe.set(job_key_prefix + item.job_id, job, px=expires_ms, nx=True)
+                pipe.zadd(lane_queue_name(item.priority), {item.job_id: score}, nx=True)
+            await pipe.execute()
+        ENQUEUE_DURATION.observe(time.perf_counter() - started)
+
+    async def promote_due(self, limit: int = settings.DEFERRED_PROMOTE_BATCH_SIZE) -> int:
+        """Give due jobs still scored in epoch ms (run_at, Arq retries, cron) a start tag.
+
+        Deferred jobs take their turn in their client's slot. Jobs without a recorded
+        client (Arq retries, cron functions) belong to no client's backlog: they get
+        the lane's current virtual time, ahead of every waiting job, so a backfill
+        cannot hold back a retry or stop the crons.
+
+        Looks at up to `limit` such jobs per lane and returns how many it re-scored.
+        ZADD XX LT only ever lowers the score of a job that is still queued, so
+        concurrent workers promoting the same job are harmless.
+        """
+        now_ms = timestamp_ms()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for priority in JobPriority:
+                pipe.zrangebyscore(lane_queue_name(priority), VIRTUAL_SCORE_LIMIT, now_ms, start=0, num=limit)
+            due = await pipe.execute()
+        job_ids = [job_id.decode() for lane in due for job_id in lane]
+        if not job_ids:
+            return 0
+
+        clients = await self.redis.hmget(FAIR_DEFERRED_CLIENTS_KEY, job_ids)
+        priorities = [priority for priority, lane in zip(JobPriority, due) for _ in lane]
+        items: List[QueuedJob] = []
+        unowned: List[QueuedJob] = []
+        for job_id, priority, client in zip(job_ids, priorities, clients):
+            if client is None or job_id.startswith(CRON_JOB_PREFIX):
+                unowned.append(QueuedJob(job_id, None, priority))
+            else:
+                items.append(QueuedJob(job_id, None, priority, client.decode()))
+        scores = await self._fair_scores(items, now_ms)
+        if unowned:
+            vtimes = await self.redis.zmscore(FAIR_VTIME_KEY, [item.priority.value for item in unowned])
+            items.extend(unowned)
+            scores.extend(int(vtime or 0) for vtime in vtimes)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for item, score in zip(items, scores):
+                pipe.zadd(lane_queue_name(item.priority), {item.job_id: score}, xx=True, lt=True)
+            pipe.hdel(FAIR_DEFERRED_CLIENTS_KEY, *job_ids)
+            await pipe.execute()
+        return len(items)
+
+    async def abort(self, job_id: str, priority: JobPriority) -> bool:
+        """Remove a job that no worker has picked up yet from its lane.
+
+        False if it was not waiting there (already started, or never enqueued); the
+        worker's claim still refuses a job cancelled in Postgres.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(lane_queue_name(priority), job_id)
+            pipe.delete(job_key_prefix + job_id)
+            pipe.hdel(FAIR_DEFERRED_CLIENTS_KEY, job_id)
+            removed, *_ = await pipe.execute()
+        return bool(removed)
+
+    async def depths(self) -> Dict[JobPriority, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for priority in JobPriority:
+                pipe.zcard(lane_queue_name(priority))
+            counts = await pipe.execute()
+        return dict(zip(JobPriority, counts))
@@ -0,0 +1,25 @@
+from typing import Dict, Optional
+from redis.asyncio import Redis
+
+# Template name -> moving average of its render time in seconds, shared by the
+# workers (which observe renders) and the API (which cancels jobs)
+RUN_SECONDS_KEY = "jobs:run-seconds"
+# Weight of the newest render in the average
+_SMOOTHING = 0.2
+
+# This worker's averages; the Redis hash holds the latest one written by any worker
+_averages: Dict[str, float] = {}
+
+
+async def record_run_seconds(redis: Redis, template: str, seconds: float):
+    """Fold a successful render's run time into the template's average (worker side)."""
+    previous = _averages.get(template)
+    average = seconds if previous is None else previous + _SMOOTHING * (seconds - previous)
+    _averages[template] = average
+    await redis.hset(RUN_SECONDS_KEY, template, repr(average))
+
+
+async def expected_run_seconds(redis: Redis, template: str) -> Optional[float]:
+    """How long a render of `template` usually takes; None before one has succeeded."""
+    value = await redis.hget(RUN_SECONDS_KEY, template)
+    return float(value) if value is not None else None
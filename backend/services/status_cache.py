@@ -0,0 +1,111 @@
+from typing import NamedTuple, Optional, Tuple, Union
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from backend.cache import TTLCache
+from backend.core_config import settings
+from backend.db.models import Job, JobStatus
+from backend.domain.jobs import JobRead
+from backend.logger import logger
+from backend.metrics import JOB_STATUS_CACHE_REQUESTS
+
+STATUS_KEY_PREFIX = "jobs:status:"
+# Every status transition is published here (see backend/services/events.py)
+JOB_EVENTS_CHANNEL = "jobs:events"
+
+
+class CachedStatus(NamedTuple):
+    etag: str
+    status: JobStatus
+    body: bytes
+
+
+def job_etag(job: Union[Job, JobRead]) -> str:
+    # updated_at changes on every status transition
+    return f'"{int(job.updated_at.timestamp() * 1_000_000):x}"'
+
+
+def encode_status(entry: CachedStatus) -> bytes:
+    return f"{entry.etag}\n{entry.status.value}\n".encode() + entry.body
+
+
+def decode_status(raw: bytes) -> CachedStatus:
+    etag, status, body = raw.split(b"\n", 2)
+    return CachedStatus(etag.decode(), JobStatus(status.decode()), body)
+
+
+def decode_job_event(raw: bytes) -> Tuple[str, CachedStatus]:
+    job_id, _, entry = raw.partition(b"\n")
+    return job_id.decode(), decode_status(entry)
+
+
+class JobStatusCache:
+    """Read-through cache of serialized `JobRead` bodies for GET /jobs/{job_id}.
+
+    Entries live in Redis (one key per job, shared by API processes and written by
+    the worker on every status transition) behind a short-lived in-process layer.
+    """
+
+    def __init__(self, redis: Redis, local: Optional[TTLCache[CachedStatus]] = None):
+        self.redis = redis
+        self.local = local
+
+    async def get(self, job_id: str) -> Optional[CachedStatus]:
+        if self.local is not None:
+            entry = self.local.get(job_id)
+            if entry is not None:
+                JOB_STATUS_CACHE_REQUESTS.labels(result="local_hit").inc()
+                return entry
+
+        try:
+            raw = await self.redis.get(STATUS_KEY_PREFIX + job_id)
+        except RedisError as e:
+            logger.warning("job_status_cache_get_failed", job_id=job_id, error=str(e))
+            raw = None
+        if raw is None:
+            JOB_STATUS_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+        JOB_STATUS_CACHE_REQUESTS.labels(result="redis_hit").inc()
+        entry = decode_status(raw)
+        if self.local is not None:
+            self.local.set(job_id, entry)
+        return entry
+
+    async def set(
+        self, job: Union[Job, JobRead], overwrite: bool = True, publish: bool = False
+    ) -> CachedStatus:
+        """Store the current state of `job`.
+
+        Readers populate with `overwrite=False` so a row they read before a worker
+        transition can never replace the newer entry the worker wrote (the local layer
+        may lag by at most STATUS_CACHE_LOCAL_TTL_SECONDS). Writers pass `publish=True`
+        to also notify waiting clients, in the same round trip.
+        """
+        entry = CachedStatus(
+            job_etag(job), job.status, JobRead.model_validate(job).model_dump_json().encode()
+        )
+        raw = encode_status(entry)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(
+                    STATUS_KEY_PREFIX + job.id,
+                    raw,
+                    ex=settings.STATUS_CACHE_TTL_SECONDS,
+                    nx=not overwrite,
+                )
+                if publish:
+                    pipe.publish(JOB_EVENTS_CHANNEL, job.id.encode() + b"\n" + raw)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("job_status_cache_set_failed", job_id=job.id, error=str(e))
+        if self.local is not None:
+            self.local.set(job.id, entry)
+        return entry
+
+    async def invalidate(self, job_id: str):
+        if self.local is not None:
+            self.local.pop(job_id)
+        try:
+            await self.redis.delete(STATUS_KEY_PREFIX + job_id)
+        except RedisError as e:
+            logger.warning("job_status_cache_invalidate_failed", job_id=job_id, error=str(e))
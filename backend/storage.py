@@ -0,0 +1,205 @@
+import hashlib
+import os
+from contextlib import closing
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from backend.core_config import settings
+
+# Job.result_file_path holds a storage reference: a filesystem path for the local
+# backend (flat paths written before sharding still resolve), s3://bucket/key for S3
+S3_SCHEME = "s3://"
+
+# (reference, last modified as a unix timestamp), as listed by scan()
+StoredObject = Tuple[str, float]
+
+
+def _boto3():
+    # Optional dependency, only needed with RESULT_STORAGE=s3
+    try:
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+    except ImportError as e:
+        raise RuntimeError("S3 result storage requires the 'boto3' package") from e
+    return boto3, TransferConfig
+
+
+def artifact_key(job_id: str, suffix: str = "") -> str:
+    """Storage key of a job's artifact: report_{id}.csv{suffix} under hash shards.
+
+    Each of the FILES_SHARD_DEPTH levels is two hex digits of a hash of the id, so
+    directories (and S3 key prefixes) stay small and evenly filled.
+    """
+    digest = hashlib.sha1(job_id.encode()).hexdigest()
+    shards = [digest[2 * i:2 * i + 2] for i in range(settings.FILES_SHARD_DEPTH)]
+    return "/".join([*shards, f"report_{job_id}.csv{suffix}"])
+
+
+def iter_file(f: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Yield the content of an open binary file in chunks, closing it at the end."""
+    with closing(f):
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+class LocalStorage:
+    """Artifacts under `root`, in hash-sharded directories.
+
+    The worker renders straight into the final directory (write_report writes a .tmp
+    file and renames it), so an artifact appears atomically and nothing is copied.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def staging_path(self, key: str) -> str:
+        """Where the worker renders the artifact for `key`."""
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def save(self, path: str, key: str) -> str:
+        """Store the rendered file at `path` under `key`; returns its reference."""
+        return path
+
+    def local_path(self, ref: str) -> Optional[str]:
+        """Filesystem path of a stored artifact, if the backend keeps it on disk."""
+        return ref
+
+    def open(self, ref: str) -> BinaryIO:
+        return open(ref, mode="rb")
+
+    def delete(self, ref: str) -> bool:
+        try:
+            os.remove(ref)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def scan(self, batch_size: int = 1000) -> Iterator[List[StoredObject]]:
+        """Every stored file, including leftover .tmp files, in batches of `batch_size`.
+
+        Walks the tree with os.scandir (no per-directory lists), so memory stays
+        bounded by the shard depth and one batch whatever the number of files.
+        """
+        batch: List[StoredObject] = []
+        stack = [self.root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        batch.append((entry.path, entry.stat(follow_symlinks=False).st_mtime))
+                        if len(batch) >= batch_size:
+                            yield batch
+                            batch = []
+        if batch:
+            yield batch
+
+
+class S3Storage:
+    """Artifacts in an S3-compatible bucket (AWS, or MinIO via S3_ENDPOINT_URL).
+
+    The worker renders into a local staging file, which is then streamed to the
+    bucket as a multipart upload (S3_MULTIPART_CHUNK_BYTES per part) and removed.
+    Credentials come from the usual AWS_* environment variables.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        boto3, TransferConfig = _boto3()
+        self.bucket = bucket
+        self.prefix = prefix
+        self.staging_dir = os.path.join(settings.FILES_DIR, "staging")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_CHUNK_BYTES,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_BYTES,
+        )
+
+    def _split(self, ref: str) -> Tuple[str, str]:
+        bucket, _, key = ref[len(S3_SCHEME):].partition("/")
+        return bucket, key
+
+    def staging_path(self, key: str) -> str:
+        os.makedirs(self.staging_dir, exist_ok=True)
+        return os.path.join(self.staging_dir, os.path.basename(key))
+
+    def save(self, path: str, key: str) -> str:
+        object_key = f"{self.prefix}{key}"
+        try:
+            self.client.upload_file(
+                path, self.bucket, object_key,
+                ExtraArgs={"ContentType": "text/csv"}, Config=self.transfer_config,
+            )
+        finally:
+            os.remove(path)
+        return f"{S3_SCHEME}{self.bucket}/{object_key}"
+
+    def local_path(self, ref: str) -> Optional[str]:
+        return None
+
+    def open(self, ref: str) -> BinaryIO:
+        bucket, key = self._split(ref)
+        try:
+            return self.client.get_object(Bucket=bucket, Key=key)["Body"]
+        except self.client.exceptions.NoSuchKey as e:
+            raise FileNotFoundError(ref) from e
+
+    def delete(self, ref: str) -> bool:
+        # DeleteObject succeeds for missing keys too, so this cannot report them
+        bucket, key = self._split(ref)
+        self.client.delete_object(Bucket=bucket, Key=key)
+        return True
+
+    def scan(self, batch_size: int = 1000) -> Iterator[List[StoredObject]]:
+        """Every object under the prefix, one listing page (up to 1000 keys) per batch."""
+        pages = self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=self.bucket, Prefix=self.prefix, PaginationConfig={"PageSize": min(batch_size, 1000)},
+        )
+        for page in pages:
+            batch = [
+                (f"{S3_SCHEME}{self.bucket}/{obj['Key']}", obj["LastModified"].timestamp())
+                for obj in page.get("Contents", [])
+            ]
+            if batch:
+                yield batch
+
+
+_local: Optional[LocalStorage] = None
+_s3: Optional[S3Storage] = None
+
+
+def _local_storage() -> LocalStorage:
+    global _local
+    if _local is None:
+        _local = LocalStorage(settings.FILES_DIR)
+    return _local
+
+
+def _s3_storage() -> S3Storage:
+    global _s3
+    if _s3 is None:
+        if not settings.S3_BUCKET:
+            raise ValueError("RESULT_STORAGE=s3 requires S3_BUCKET")
+        _s3 = S3Storage(settings.S3_BUCKET, settings.S3_PREFIX, settings.S3_ENDPOINT_URL)
+    return _s3
+
+
+def get_storage():
+    """Backend new artifacts are written to (RESULT_STORAGE)."""
+    backend = settings.RESULT_STORAGE.lower()
+    if backend == "local":
+        return _local_storage()
+    if backend == "s3":
+        return _s3_storage()
+    raise ValueError(f"Unsupported RESULT_STORAGE {settings.RESULT_STORAGE!r}")
+
+
+def storage_for(ref: str):
+    """Backend holding an existing artifact, whatever RESULT_STORAGE is now."""
+    if ref.startswith(S3_SCHEME):
+        return _s3_storage()
+    return _local_storage()
@@ -0,0 +1,52 @@
+"""Submission throughput: one POST /jobs/ per job vs POST /jobs/batch.
+
+Usage (against a running API, e.g. `docker-compose up`):
+    python -m benchmarks.batch_submit --jobs 5000 --batch-size 1000
+"""
+import argparse
+import asyncio
+import time
+import httpx
+
+BASE_URL = "http://localhost:8000"
+HEADERS = {"Authorization": "Bearer supersecretkey"}
+JOB = {"template_name": "report_v1"}
+
+
+async def single(client: httpx.AsyncClient, jobs: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            response = await client.post("/jobs/", json=JOB)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(jobs)))
+    return jobs / (time.perf_counter() - start)
+
+
+async def batched(client: httpx.AsyncClient, jobs: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, jobs, batch_size):
+        items = [JOB] * min(batch_size, jobs - offset)
+        response = await client.post("/jobs/batch", json={"items": items})
+        response.raise_for_status()
+    return jobs / (time.perf_counter() - start)
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.base_url, headers=HEADERS, timeout=120) as client:
+        single_rate = await single(client, args.jobs, args.concurrency)
+        batch_rate = await batched(client, args.jobs, args.batch_size)
+    print(f"POST /jobs/      {single_rate:10.1f} jobs/s")
+    print(f"POST /jobs/batch {batch_rate:10.1f} jobs/s  ({batch_rate / single_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
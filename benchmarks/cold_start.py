@@ -0,0 +1,77 @@
+"""Cold start of the API and worker processes, as JSON to track over releases.
+
+- import:      seconds to import backend.main / worker.main in a fresh interpreter
+               (median of --runs), the same span the processes export as
+               jobs_startup_seconds{phase="import"}
+- first_query: with --db, latency of the first query on a fresh engine, cold vs
+               after warm_pool (what a request or job pays right after startup)
+
+Usage:
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --runs 5 --db --output cold_start.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict
+from sqlalchemy import text
+
+MODULES = ("backend.main", "worker.main")
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_seconds(module: str, runs: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+            check=True, capture_output=True, text=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"median_s": round(statistics.median(samples), 4), "max_s": round(max(samples), 4)}
+
+
+async def first_query_ms(warm: bool) -> float:
+    from backend.db.session import _create_engine, warm_pool
+    from backend.core_config import settings
+
+    engine = _create_engine(settings.sqlalchemy_database_uri)
+    try:
+        if warm:
+            await warm_pool(engine)
+        start = time.perf_counter()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return round((time.perf_counter() - start) * 1000, 2)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", action="store_true", help="also time the first query (needs POSTGRES_*)")
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    results = {"import": {module: import_seconds(module, args.runs) for module in MODULES}}
+    if args.db:
+        results["first_query"] = {
+            "cold_ms": asyncio.run(first_query_ms(warm=False)),
+            "warm_ms": asyncio.run(first_query_ms(warm=True)),
+        }
+
+    text_out = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text_out + "\n")
+    else:
+        print(text_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies_ms: List[float], elapsed_s: float) -> Dict[str, float]:
+    return {
+        "ops_per_s": round(len(latencies_ms) / elapsed_s, 1),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+    }
+
+
+async def run_concurrently(
+    op: Callable[[int], Awaitable[None]], count: int, concurrency: int
+) -> Dict[str, float]:
+    """Run `op(i)` for i in range(count) with bounded concurrency; return latency stats."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int):
+        async with sem:
+            start = time.perf_counter()
+            await op(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return summarize(latencies, time.perf_counter() - start)
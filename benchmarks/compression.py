@@ -0,0 +1,68 @@
+"""Disk usage and transfer time of report artifacts per codec.
+
+Writes the same synthetic jobs-export-shaped report uncompressed, gzip and zstd,
+then compares size, write time, on-the-fly decode time and transfer time at a
+given link speed.
+
+Usage:
+    python -m benchmarks.compression --rows 1000000 --mbps 100
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from backend.compression import iter_decompressed
+from backend.db.models import Job
+from backend.reports import get_template, register_template
+from backend.reports.writer import write_report
+
+HEADER = ["Job ID", "Status", "Template", "Created At", "Started At", "Completed At"]
+
+
+def synthetic_template(rows: int):
+    @register_template("bench_compression", header=HEADER)
+    def bench_compression(ctx):
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for i in range(rows):
+            created = start + timedelta(seconds=i)
+            yield [
+                str(uuid.uuid4()), "succeeded", "report_v1", created.isoformat(),
+                (created + timedelta(seconds=2)).isoformat(), (created + timedelta(seconds=5)).isoformat(),
+            ]
+    return get_template("bench_compression")
+
+
+async def main(args):
+    template = synthetic_template(args.rows)
+    job = Job(id="bench", template_name=template.name, created_at=datetime.now(timezone.utc))
+    directory = tempfile.mkdtemp()
+    print(f"{'codec':<6} {'size MB':>9} {'ratio':>6} {'write s':>8} {'decode s':>9} {'transfer s':>11}")
+    baseline = None
+    for encoding in (None, "gzip", "zstd"):
+        path = os.path.join(directory, f"report.{encoding or 'csv'}")
+        start = time.perf_counter()
+        await write_report(template, job, path, encoding)
+        write_s = time.perf_counter() - start
+
+        decode_s = 0.0
+        if encoding:
+            start = time.perf_counter()
+            for _ in iter_decompressed(path, encoding):
+                pass
+            decode_s = time.perf_counter() - start
+
+        size = os.path.getsize(path)
+        baseline = baseline or size
+        transfer_s = size * 8 / (args.mbps * 1e6)
+        print(f"{encoding or 'none':<6} {size / 1e6:>9.1f} {baseline / size:>6.1f} "
+              f"{write_s:>8.2f} {decode_s:>9.2f} {transfer_s:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mbps", type=float, default=100.0, help="link speed for transfer estimate")
+    asyncio.run(main(parser.parse_args()))
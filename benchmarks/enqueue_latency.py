@@ -0,0 +1,43 @@
+"""Enqueue latency: fresh Arq pool per request vs the shared, pipelined JobQueue.
+
+Usage (needs a reachable Redis, see REDIS_HOST / REDIS_PORT):
+    python -m benchmarks.enqueue_latency --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import uuid
+from arq import create_pool
+from arq.connections import RedisSettings
+from backend.core_config import settings
+from backend.services.queue import JobQueue
+from benchmarks.common import run_concurrently
+
+
+async def run(enqueue, requests: int, concurrency: int):
+    return await run_concurrently(lambda i: enqueue(str(uuid.uuid4())), requests, concurrency)
+
+
+async def main(requests: int, concurrency: int):
+    redis_settings = RedisSettings(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+
+    async def per_request_pool(job_id: str):
+        # Previous JobsService.enqueue_job_task behaviour
+        redis = await create_pool(redis_settings)
+        await redis.enqueue_job("process_job", job_id, _job_id=job_id)
+        await redis.aclose()
+
+    print("per-request pool:", await run(per_request_pool, requests, concurrency))
+
+    queue = await JobQueue.connect()
+    try:
+        print("shared JobQueue: ", await run(queue.enqueue, requests, concurrency))
+    finally:
+        await queue.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
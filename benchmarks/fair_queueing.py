@@ -0,0 +1,126 @@
+"""Interactive job wait while a bulk backfill is queued: FIFO vs fair queueing vs lanes.
+
+Simulates a worker process (WeightedSlots over the real lane queues, jobs taking
+--service-ms each) draining a --backfill-job bulk submission while interactive jobs
+arrive every --interval-ms. Reports the interactive queue wait percentiles for:
+
+- fifo:  everything in the normal lane under one client id (the old single queue)
+- fair:  same lane, backfill and interactive jobs under different client ids
+- lanes: interactive jobs submitted with priority "high"
+
+Usage (in-process fakeredis by default; --real-redis uses REDIS_HOST / REDIS_PORT and
+clears the lane queues and fair-queueing keys there, so only point it at a scratch Redis):
+    python -m benchmarks.fair_queueing --backfill 5000 --interactive 200
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+from arq.utils import timestamp_ms
+from backend.core_config import settings
+from backend.db.models import JobPriority
+from backend.services.queue import (
+    FAIR_TAGS_KEY_PREFIX, FAIR_VTIME_KEY, JobQueue, QueuedJob, advance_virtual_time, lane_queue_name,
+)
+from benchmarks.common import percentile
+from benchmarks.suite import connect_redis
+from worker.lanes import WeightedSlots
+
+
+async def drain(
+    redis, slots: WeightedSlots, enqueued_at: Dict[str, float], waits: Dict[str, float],
+    total: int, service_s: float,
+):
+    # Mirrors Arq's poll loop: lowest due scores first, one claim per job
+    async def run(job_id: str, priority: JobPriority, score: float):
+        waits[job_id] = time.perf_counter() - enqueued_at[job_id]
+        await advance_virtual_time(redis, priority, int(score))
+        await asyncio.sleep(service_s)
+        slots.release(priority.value)
+
+    async def lane(priority: JobPriority):
+        queue = lane_queue_name(priority)
+        running = set()
+        while len(waits) < total:
+            batch = await redis.zrangebyscore(queue, "-inf", timestamp_ms(), start=0, num=10, withscores=True)
+            if not batch:
+                await asyncio.sleep(0.001)
+                continue
+            for job_id, score in batch:
+                await slots.acquire(priority.value)
+                if not await redis.zrem(queue, job_id):
+                    slots.release(priority.value)
+                    continue
+                task = asyncio.create_task(run(job_id.decode(), priority, score))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                # Re-poll after each start so newly enqueued, better-placed jobs go next
+                break
+        await asyncio.gather(*running)
+
+    lanes = [asyncio.create_task(lane(priority)) for priority in JobPriority]
+    while len(waits) < total:
+        await asyncio.sleep(0.01)
+    for task in lanes:
+        task.cancel()
+    await asyncio.gather(*lanes, return_exceptions=True)
+
+
+async def scenario(mode: str, args) -> Dict[str, float]:
+    redis = await connect_redis(not args.real_redis)
+    await redis.delete(
+        FAIR_VTIME_KEY,
+        *(lane_queue_name(priority) for priority in JobPriority),
+        *(FAIR_TAGS_KEY_PREFIX + priority.value for priority in JobPriority),
+    )
+    queue = JobQueue(redis)
+    slots = WeightedSlots(
+        settings.WORKER_MAX_JOBS,
+        {priority.value: settings.QUEUE_WEIGHTS.get(priority.value, 1) for priority in JobPriority},
+    )
+    enqueued_at: Dict[str, float] = {}
+    waits: Dict[str, float] = {}
+
+    backfill = [QueuedJob(f"bulk-{i}", None, JobPriority.normal, "backfill") for i in range(args.backfill)]
+    now = time.perf_counter()
+    enqueued_at.update((item.job_id, now) for item in backfill)
+    await queue.enqueue_many(backfill)
+
+    async def interactive():
+        for i in range(args.interactive):
+            job_id = f"ui-{i}"
+            priority = JobPriority.high if mode == "lanes" else JobPriority.normal
+            client_id = "backfill" if mode == "fifo" else f"ui-{i % 20}"
+            enqueued_at[job_id] = time.perf_counter()
+            await queue.enqueue(job_id, None, priority, client_id)
+            await asyncio.sleep(args.interval_ms / 1000)
+
+    producer = asyncio.create_task(interactive())
+    await asyncio.sleep(0)
+    await drain(
+        redis, slots, enqueued_at, waits, args.backfill + args.interactive, args.service_ms / 1000
+    )
+    await producer
+    await queue.close()
+
+    interactive_waits: List[float] = [w * 1000 for job_id, w in waits.items() if job_id.startswith("ui-")]
+    return {
+        "p50_ms": round(percentile(interactive_waits, 50), 1),
+        "p99_ms": round(percentile(interactive_waits, 99), 1),
+        "max_ms": round(max(interactive_waits), 1),
+    }
+
+
+async def main(args):
+    for mode in ("fifo", "fair", "lanes"):
+        print(f"{mode:>5}: interactive wait {await scenario(mode, args)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backfill", type=int, default=5000)
+    parser.add_argument("--interactive", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--service-ms", type=float, default=2.0)
+    parser.add_argument("--real-redis", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""Memory cost of idle SSE / long-poll waiters parked on one JobEventHub.
+
+Parks N coroutines on distinct job ids (what an idle SSE stream or `?wait=` request
+does after its initial read), then publishes one event per job and times the fan-out.
+
+Usage (needs a reachable Redis, see REDIS_HOST / REDIS_PORT):
+    python -m benchmarks.idle_waiters --waiters 20000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from arq import create_pool
+from backend.db.models import Job, JobStatus
+from backend.services.events import JobEventHub
+from backend.services.queue import get_redis_settings
+from backend.services.status_cache import JobStatusCache
+
+
+async def main(waiters: int):
+    redis = await create_pool(get_redis_settings())
+    hub = JobEventHub(redis)
+    await hub.start()
+    notified = 0
+
+    async def park(job_id: str):
+        nonlocal notified
+        with hub.subscribe(job_id) as waiter:
+            if await waiter.wait(3600) and waiter.entry is not None:
+                notified += 1
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tasks = [asyncio.create_task(park(f"bench-{i}")) for i in range(waiters)]
+    await asyncio.sleep(0.5)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{hub.waiter_count} idle waiters, {(after - before) / waiters:.0f} bytes/waiter "
+          "(waiter + parked task, excluding the HTTP connection itself)")
+
+    cache = JobStatusCache(redis)
+    now = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    for i in range(waiters):
+        job = Job(id=f"bench-{i}", status=JobStatus.succeeded, template_name="report_v1",
+                  created_at=now, updated_at=now)
+        await cache.set(job, publish=True)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=120)
+    print(f"fan-out of {notified} events in {time.perf_counter() - start:.2f}s")
+
+    await hub.close()
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--waiters", type=int, default=20000)
+    asyncio.run(main(parser.parse_args().waiters))
@@ -0,0 +1,122 @@
+"""GET /jobs/ page building: ORM + JobRead validation vs column rows + orjson.
+
+Fetches --pages pages of --limit jobs through JobsRepo from an in-memory SQLite copy
+of the jobs table (pip install aiosqlite), then serializes them either the old way
+(Job entities, List[JobRead] validation from attributes, Pydantic JSON dump) or the
+new way (list_job_rows + dump_job_rows), with all fields and with a lean
+?fields=id,status,created_at projection. Reports rows/s for fetch + serialize and
+for serialization alone. SQLite only stands in for the row fetch; compare paths,
+not absolute numbers, against Postgres.
+
+Usage:
+    python -m benchmarks.list_serialization --rows 5000 --limit 100 --pages 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from backend.db.models import Job, JobStatus
+from backend.db.session import Base
+from backend.domain.jobs import JOB_READ_FIELDS, JobRead, dump_job_rows, parse_fields
+from backend.repo.jobs import JobsRepo
+
+PAGE = TypeAdapter(List[JobRead])
+LEAN_FIELDS = parse_fields("id,status,created_at")
+
+
+def seed_rows(count: int) -> List[Dict]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created = start + timedelta(seconds=i)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "status": JobStatus.succeeded,
+            "template_name": "jobs_export_v1",
+            "metadata_info": {"status": "succeeded", "limit": 1000, "created_after": "2026-01-01T00:00:00Z"},
+            "error_message": None,
+            "client_id": f"client-{i % 20}",
+            "created_at": created,
+            "updated_at": created + timedelta(seconds=5),
+            "started_at": created + timedelta(seconds=1),
+            "completed_at": created + timedelta(seconds=5),
+            "result_file_path": f"/files/report_{i}.csv.gz",
+            "result_encoding": "gzip",
+        })
+    return rows
+
+
+def old_serialize(jobs) -> bytes:
+    # What FastAPI does for response_model=List[JobRead] returning ORM objects
+    return PAGE.dump_json(PAGE.validate_python(jobs, from_attributes=True))
+
+
+async def measure(label: str, pages: int, fetch: Callable, serialize: Callable) -> Dict[str, float]:
+    rows = 0
+    serialize_time = 0.0
+    started = time.perf_counter()
+    for _ in range(pages):
+        page = await fetch()
+        t = time.perf_counter()
+        serialize(page)
+        serialize_time += time.perf_counter() - t
+        rows += len(page)
+    total = time.perf_counter() - started
+    stats = {
+        "rows_per_s": round(rows / total),
+        "serialize_rows_per_s": round(rows / serialize_time),
+    }
+    print(f"{label:>22}: {stats}")
+    return stats
+
+
+async def main(args):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Job.__table__])
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        await session.execute(insert(Job), seed_rows(args.rows))
+        await session.commit()
+
+    async with session_factory() as session:
+        repo = JobsRepo(session)
+
+        # Same JSON either way (the equivalence the endpoint relies on)
+        jobs = await repo.list_jobs(limit=args.limit)
+        rows = await repo.list_job_rows(JOB_READ_FIELDS, limit=args.limit)
+        assert json.loads(old_serialize(jobs)) == json.loads(dump_job_rows(rows, JOB_READ_FIELDS))
+
+        async def orm_page():
+            # Fresh entities every page, as each request has its own session
+            session.expunge_all()
+            return await repo.list_jobs(limit=args.limit)
+
+        await measure("orm + JobRead", args.pages, orm_page, old_serialize)
+        await measure(
+            "rows + orjson",
+            args.pages,
+            lambda: repo.list_job_rows(JOB_READ_FIELDS, limit=args.limit),
+            lambda page: dump_job_rows(page, JOB_READ_FIELDS),
+        )
+        await measure(
+            "rows + orjson (lean)",
+            args.pages,
+            lambda: repo.list_job_rows(LEAN_FIELDS, limit=args.limit),
+            lambda page: dump_job_rows(page, LEAN_FIELDS),
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""Structured logging cost on the caller: synchronous print vs the queue-backed sink.
+
+Writes to a stream that sleeps --write-delay-ms per write() call, standing in for a
+slow log collector behind stdout (0 = /dev/null speed). Reports:
+
+- events/s a single caller can log (the loop the event loop would be blocked in)
+- added latency of an in-process ASGI request whose handler logs --events-per-request
+  events, vs the same request with logging dropped entirely
+- how many events the queue sink dropped because the writer could not keep up
+
+Usage:
+    python -m benchmarks.logging_overhead --events 100000 --write-delay-ms 0.05
+"""
+import argparse
+import asyncio
+import time
+import structlog
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from backend import logger as logger_module
+from backend.logger import setup_logging
+from benchmarks.metrics_overhead import asgi_request_us
+
+
+class SlowStream:
+    """Accepts str (sync path) or bytes (sink); each write() costs `delay` seconds."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def build_app(events_per_request: int, log: bool) -> FastAPI:
+    app = FastAPI()
+    logger = structlog.get_logger()
+
+    @app.get("/ping")
+    async def ping():
+        if log:
+            for i in range(events_per_request):
+                logger.info("bench_request_event", i=i, job_id="3f2c9a1b")
+        return {"ok": True}
+    return app
+
+
+def overflow_drops() -> float:
+    return REGISTRY.get_sample_value("log_events_dropped_total", {"reason": "overflow"}) or 0.0
+
+
+def events_per_s(events: int) -> float:
+    logger = structlog.get_logger()
+    start = time.perf_counter()
+    for i in range(events):
+        logger.info("bench_event", i=i, job_id="3f2c9a1b")
+    return round(events / (time.perf_counter() - start))
+
+
+async def main(args):
+    delay = args.write_delay_ms / 1000
+    baseline_us = await asgi_request_us(build_app(args.events_per_request, log=False), args.requests)
+    print(f"request without logging: {baseline_us:.1f} us")
+    for label, async_sink in (("sync print", False), ("queue sink", True)):
+        stream = SlowStream(delay)
+        setup_logging(async_sink=async_sink, stream=stream)
+        dropped = overflow_drops()
+        rate = events_per_s(args.events)
+        request_us = await asgi_request_us(build_app(args.events_per_request, log=True), args.requests)
+        if async_sink:
+            # Drain, so writes/drops cover everything logged above
+            logger_module._close_sink()
+        print(
+            f"{label:>10}: {rate} events/s, request +{request_us - baseline_us:.1f} us "
+            f"({args.events_per_request} events), {stream.writes} writes, "
+            f"{overflow_drops() - dropped:.0f} dropped on overflow"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--events-per-request", type=int, default=3)
+    parser.add_argument("--write-delay-ms", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""Per-event cost of the metrics instrumentation, in microseconds.
+
+Times the primitives on the hot paths: a labelled histogram observation, the SQL
+before/after cursor hooks, and a request through MetricsMiddleware vs. the bare app.
+
+Usage:
+    python -m benchmarks.metrics_overhead --iterations 200000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.api.metrics import MetricsMiddleware
+from backend.metrics import ENQUEUE_DURATION, instrument_engine
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def sql_hooks():
+    engine = create_async_engine("postgresql+asyncpg://bench@localhost/bench")
+    instrument_engine(engine)
+    dispatch = engine.sync_engine.dispatch
+    before, after = dispatch.before_cursor_execute, dispatch.after_cursor_execute
+    context = SimpleNamespace()
+    statement = "SELECT jobs.id FROM jobs WHERE jobs.id = $1"
+
+    def hooks():
+        before(None, None, statement, (), context, False)
+        after(None, None, statement, (), context, False)
+    return hooks
+
+
+async def asgi_request_us(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/ping", "raw_path": b"/ping",
+             "query_string": b"", "headers": [], "root_path": ""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def main(iterations: int):
+    print(f"histogram observe     {per_call_us(lambda: ENQUEUE_DURATION.observe(0.001), iterations):6.2f} us")
+    print(f"SQL before+after hook {per_call_us(sql_hooks(), iterations):6.2f} us")
+    requests = max(1, iterations // 20)
+    bare = await asgi_request_us(build_app(False), requests)
+    instrumented = await asgi_request_us(build_app(True), requests)
+    print(f"request middleware    {instrumented - bare:6.2f} us  ({bare:.1f} -> {instrumented:.1f} us/request)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    asyncio.run(main(parser.parse_args().iterations))
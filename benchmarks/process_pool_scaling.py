@@ -0,0 +1,64 @@
+"""Jobs/s on a CPU-bound template as the worker's process pool grows.
+
+Runs `--jobs` concurrent renders through write_report, once in thread mode (GIL-bound
+baseline) and then with process pools of 1, 2, 4, ... up to the core count.
+
+Usage:
+    python -m benchmarks.process_pool_scaling --jobs 32 --rows 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from backend.db.models import Job, JobStatus
+from backend.reports import get_template, register_template
+from backend.reports.writer import write_report
+
+ROWS = 2000
+
+
+@register_template("bench_cpu_bound", header=["n", "digest"], execution="process")
+def bench_cpu_bound(ctx):
+    for n in range(ROWS):
+        digest = str(n).encode()
+        for _ in range(200):
+            digest = hashlib.sha256(digest).digest()
+        yield [n, digest.hex()]
+
+
+async def run(template, jobs: int, pool) -> float:
+    directory = tempfile.mkdtemp()
+    now = datetime.now(timezone.utc)
+    job = Job(id="bench", template_name=template.name, status=JobStatus.running,
+              created_at=now, updated_at=now)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        write_report(template, job, os.path.join(directory, f"{i}.csv"), process_pool=pool)
+        for i in range(jobs)
+    ))
+    return jobs / (time.perf_counter() - start)
+
+
+async def main(args):
+    global ROWS
+    ROWS = args.rows
+    template = get_template("bench_cpu_bound")
+
+    print(f"thread mode      {await run(replace(template, execution='thread'), args.jobs, None):8.2f} jobs/s")
+    size = 1
+    while size <= os.cpu_count():
+        with ProcessPoolExecutor(max_workers=size) as pool:
+            print(f"process pool {size:>3} {await run(template, args.jobs, pool):8.2f} jobs/s")
+        size *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=ROWS)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,77 @@
+"""List/get throughput with read routing off (primary only) and on (replica).
+
+Runs a steady write load (POST-like inserts) against the primary while readers call
+JobsRepo.list_jobs / get_by_id through either engine. Point it at two local Postgres
+instances, the second streaming from the first (or at least holding the same data).
+
+Usage:
+    python -m benchmarks.read_routing --primary localhost:5432 --replica localhost:5433
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from backend.core_config import settings
+from backend.db.session import _create_engine
+from backend.repo.jobs import JobsRepo
+
+
+def url(server: str) -> str:
+    return (f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+            f"@{server}/{settings.POSTGRES_DB}")
+
+
+async def write_load(sessions, stop: asyncio.Event):
+    while not stop.is_set():
+        async with sessions() as session:
+            await JobsRepo(session).create_idempotent(
+                {"id": str(uuid.uuid4()), "template_name": "report_v1"}
+            )
+
+
+async def read_load(sessions, job_ids, seconds: float, concurrency: int) -> dict:
+    counts = {"list": 0, "get": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            async with sessions() as session:
+                repo = JobsRepo(session)
+                if random.random() < 0.2:
+                    await repo.list_jobs(limit=100)
+                    counts["list"] += 1
+                else:
+                    await repo.get_by_id(random.choice(job_ids))
+                    counts["get"] += 1
+
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return {op: round(n / seconds, 1) for op, n in counts.items()}
+
+
+async def main(args):
+    primary = async_sessionmaker(_create_engine(url(args.primary)), expire_on_commit=False)
+    replica = async_sessionmaker(_create_engine(url(args.replica)), expire_on_commit=False)
+    async with primary() as session:
+        job_ids = [job.id for job in await JobsRepo(session).list_jobs(limit=1000)]
+    if not job_ids:
+        raise SystemExit("no jobs in the primary; create some first")
+
+    for label, readers in (("routing off", primary), ("routing on ", replica)):
+        stop = asyncio.Event()
+        writers = [asyncio.create_task(write_load(primary, stop)) for _ in range(args.writers)]
+        result = await read_load(readers, job_ids, args.seconds, args.concurrency)
+        stop.set()
+        await asyncio.gather(*writers)
+        print(f"{label}: {result} reads/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--primary", default="localhost:5432")
+    parser.add_argument("--replica", default="localhost:5433")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""Stream a large jobs_export_v1 report and watch RSS and event-loop lag.
+
+A ticker coroutine runs alongside the export, standing in for concurrent jobs:
+if the report blocked the loop, its lag would spike.
+
+Usage (needs the configured Postgres, migrated):
+    python -m benchmarks.report_export --seed 1000000 --limit 1000000
+"""
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from backend.db.models import Job, JobStatus
+from backend.db.session import SessionLocal
+from backend.reports import get_template
+from backend.reports.writer import write_report
+from backend.repo.jobs import JobsRepo
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(count: int):
+    now = datetime.now(timezone.utc)
+    async with SessionLocal() as session:
+        repo = JobsRepo(session)
+        for start in range(0, count, 10000):
+            await repo.create_many([
+                {
+                    "id": str(uuid.uuid4()),
+                    "idempotency_key": None,
+                    "status": JobStatus.succeeded,
+                    "template_name": "report_v1",
+                    "metadata_info": None,
+                    "run_at": None,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for _ in range(min(10000, count - start))
+            ])
+
+
+async def ticker(lags: list, stop: asyncio.Event, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def main(args):
+    if args.seed:
+        await seed(args.seed)
+
+    job = Job(
+        id=str(uuid.uuid4()),
+        template_name="jobs_export_v1",
+        created_at=datetime.now(timezone.utc),
+        metadata_info={"limit": args.limit},
+    )
+    path = os.path.join(tempfile.mkdtemp(), "export.csv")
+    rss_before = max_rss_mb()
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+
+    start = time.perf_counter()
+    rows = await write_report(get_template("jobs_export_v1"), job, path)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    lags.sort()
+    print(f"rows={rows} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), "
+          f"file={os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"max RSS {rss_before:.0f} MB -> {max_rss_mb():.0f} MB")
+    print(f"loop lag p50={lags[len(lags) // 2]:.2f}ms p99={lags[int(len(lags) * 0.99)]:.2f}ms max={lags[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0, help="insert this many jobs first")
+    parser.add_argument("--limit", type=int, default=1_000_000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+"""Result file layout: one flat directory vs hash-sharded directories.
+
+Creates --files empty artifacts in each layout under a temporary directory, then
+reports per lookup (os.stat of a random existing artifact, what the download
+endpoint does), and for LocalStorage.scan (the orphan sweeper's listing) files/s and
+peak Python memory. Flat-directory costs depend heavily on the filesystem; run it
+on the one that holds FILES_DIR.
+
+Usage:
+    python -m benchmarks.storage_layout --files 200000 --lookups 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+import uuid
+from backend.core_config import settings
+from backend.storage import LocalStorage, artifact_key
+
+
+def populate(storage: LocalStorage, ids, sharded: bool):
+    paths = []
+    for job_id in ids:
+        key = artifact_key(job_id) if sharded else f"report_{job_id}.csv"
+        path = storage.staging_path(key)
+        open(path, "wb").close()
+        paths.append(path)
+    return paths
+
+
+def lookup_us(paths, lookups: int) -> float:
+    sample = random.sample(paths, min(lookups, len(paths)))
+    start = time.perf_counter()
+    for path in sample:
+        os.stat(path)
+    return (time.perf_counter() - start) / len(sample) * 1e6
+
+
+def scan(storage: LocalStorage, batch_size: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(len(batch) for batch in storage.scan(batch_size))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(count / elapsed), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=settings.CLEANUP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ids = [str(uuid.uuid4()) for _ in range(args.files)]
+    for label, sharded in (("flat", False), (f"sharded (depth {settings.FILES_SHARD_DEPTH})", True)):
+        root = tempfile.mkdtemp(prefix="bench-storage-")
+        try:
+            storage = LocalStorage(root)
+            start = time.perf_counter()
+            paths = populate(storage, ids, sharded)
+            create_us = (time.perf_counter() - start) / len(ids) * 1e6
+            stat_us = lookup_us(paths, args.lookups)
+            files_per_s, peak_kib = scan(storage, args.batch_size)
+            print(
+                f"{label:>20}: create {create_us:6.1f} us, lookup {stat_us:5.2f} us, "
+                f"scan {files_per_s} files/s (peak {peak_kib:.0f} KiB)"
+            )
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Reproducible load suite for the API and worker, with baseline regression checks.
+
+Runs the real FastAPI app in-process (httpx ASGI transport, no network hop) and the
+worker's process_job against a scratch Postgres database, then reports
+throughput and latency percentiles as JSON:
+
+- create:   POST /jobs/
+- list:     GET /jobs/?limit=50 (keyset pages)
+- get:      GET /jobs/{id}
+- worker:   process_job throughput over the queued jobs (claim, render, complete)
+- download: GET /jobs/{id}/download
+- cleanup:  cleanup_old_jobs over --cleanup-rows expired rows (one partition drop)
+
+POSTGRES_* must point at a database the suite may write to (tables are created if
+missing, rows are left behind). Redis comes from REDIS_HOST / REDIS_PORT, or use
+--fake-redis for an in-process fakeredis server (pip install fakeredis).
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.15
+
+With --baseline the exit status is 1 if any throughput dropped, or any p99 grew,
+by more than --threshold (a fraction) relative to the baseline.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+import httpx
+from arq.connections import ArqRedis, create_pool
+from sqlalchemy import insert
+from backend.cache import TTLCache
+from backend.core_config import settings
+from backend.db.models import Job, JobStatus
+from backend.db.session import Base, SessionLocal, engine
+from backend.repo.partitions import JobPartitionsRepo
+from backend.services.events import JobEventHub
+from backend.services.queue import JobQueue, get_redis_settings
+from backend.services.status_cache import JobStatusCache
+from benchmarks.common import run_concurrently
+
+HEADERS = {"Authorization": f"Bearer {settings.API_KEY}"}
+JOB = {"template_name": "report_v1"}
+
+Results = Dict[str, Dict[str, float]]
+
+
+async def connect_redis(fake: bool) -> ArqRedis:
+    if not fake:
+        return await create_pool(get_redis_settings())
+    import fakeredis
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+
+    pool = ConnectionPool(connection_class=FakeConnection, server=fakeredis.FakeServer())
+    return ArqRedis(connection_pool=pool)
+
+
+async def bench_api(client: httpx.AsyncClient, args) -> Tuple[Results, List[str]]:
+    results: Results = {}
+    job_ids: List[str] = []
+
+    async def create(i: int):
+        response = await client.post("/jobs/", json=JOB)
+        response.raise_for_status()
+        job_ids.append(response.json()["id"])
+
+    results["create"] = await run_concurrently(create, args.jobs, args.concurrency)
+
+    async def list_page(i: int):
+        response = await client.get("/jobs/", params={"limit": 50})
+        response.raise_for_status()
+
+    results["list"] = await run_concurrently(list_page, args.requests, args.concurrency)
+
+    ids = itertools.cycle(job_ids)
+
+    async def get(i: int):
+        response = await client.get(f"/jobs/{next(ids)}")
+        response.raise_for_status()
+
+    results["get"] = await run_concurrently(get, args.requests, args.concurrency)
+    return results, job_ids
+
+
+async def bench_worker(redis: ArqRedis) -> Dict[str, float]:
+    from worker.main import process_job
+    from backend.services.events import JobEventHub
+
+    # Drains the Arq queue the API filled, at the worker's max_jobs concurrency. Arq's
+    # own polling is left out: it needs INFO/real Redis and adds a fixed poll delay.
+    job_ids = [job_id.decode() for job_id in await redis.zrange(redis.default_queue_name, 0, -1)]
+    event_hub = JobEventHub(redis)
+    await event_hub.start()
+    ctx = {"redis": redis, "job_try": 1, "event_hub": event_hub}
+    try:
+        stats = await run_concurrently(
+            lambda i: process_job(ctx, job_ids[i]), len(job_ids), settings.WORKER_MAX_JOBS
+        )
+    finally:
+        await event_hub.close()
+    return {"jobs_per_s": stats["ops_per_s"], "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"]}
+
+
+async def bench_download(client: httpx.AsyncClient, job_ids: List[str], args) -> Dict[str, float]:
+    ids = itertools.cycle(job_ids)
+
+    async def download(i: int):
+        response = await client.get(f"/jobs/{next(ids)}/download")
+        response.raise_for_status()
+
+    return await run_concurrently(download, args.requests, args.concurrency)
+
+
+async def bench_cleanup(rows: int) -> Dict[str, float]:
+    from worker.main import cleanup_old_jobs
+
+    created_at = datetime.now(timezone.utc) - timedelta(days=settings.JOB_RETENTION_DAYS + 1)
+    async with SessionLocal() as session:
+        # One expired daily partition, dropped whole by the cleanup
+        await JobPartitionsRepo(session).ensure_partitions(created_at.date(), created_at.date())
+        for start in range(0, rows, 1000):
+            batch = []
+            for _ in range(min(1000, rows - start)):
+                path = os.path.join(settings.FILES_DIR, f"expired_{uuid.uuid4()}.csv")
+                open(path, "w").close()
+                batch.append({
+                    "id": str(uuid.uuid4()),
+                    "status": JobStatus.succeeded,
+                    "template_name": JOB["template_name"],
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "result_file_path": path,
+                })
+            await session.execute(insert(Job), batch)
+        await session.commit()
+
+    start = time.perf_counter()
+    await cleanup_old_jobs({})
+    elapsed = time.perf_counter() - start
+    return {"rows_per_s": round(rows / elapsed, 1), "elapsed_s": round(elapsed, 3)}
+
+
+async def run(args) -> Results:
+    from backend.main import app
+
+    settings.FILES_DIR = tempfile.mkdtemp(prefix="bench-files-")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        today = datetime.now(timezone.utc).date()
+        await JobPartitionsRepo(session).ensure_partitions(today, today + timedelta(days=1))
+
+    redis = await connect_redis(args.fake_redis)
+    # Same wiring as the lifespan in backend/main.py, on the chosen Redis
+    app.state.job_queue = JobQueue(redis)
+    app.state.status_cache = JobStatusCache(
+        redis, TTLCache(settings.STATUS_CACHE_LOCAL_SIZE, settings.STATUS_CACHE_LOCAL_TTL_SECONDS)
+    )
+    app.state.event_hub = JobEventHub(redis)
+    await app.state.event_hub.start()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", headers=HEADERS
+        ) as client:
+            results, job_ids = await bench_api(client, args)
+            # Let the micro-batched enqueues land before the worker drains the queue
+            await asyncio.sleep(settings.ENQUEUE_BATCH_WINDOW_MS / 1000 * 2)
+            results["worker"] = await bench_worker(redis)
+            results["download"] = await bench_download(client, job_ids, args)
+        results["cleanup"] = await bench_cleanup(args.cleanup_rows)
+    finally:
+        await app.state.event_hub.close()
+        await app.state.job_queue.close()
+        await engine.dispose()
+    return results
+
+
+# Higher is better for throughput, lower is better for latency; other keys are informational
+THROUGHPUT_KEYS = ("ops_per_s", "jobs_per_s", "rows_per_s")
+LATENCY_KEYS = ("p99_ms",)
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[str]:
+    regressions = []
+    for name, metrics in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for key, expected in metrics.items():
+            actual = current.get(key)
+            if actual is None or not expected:
+                continue
+            if key in THROUGHPUT_KEYS and actual < expected * (1 - threshold):
+                regressions.append(f"{name}.{key}: {actual} < baseline {expected}")
+            elif key in LATENCY_KEYS and actual > expected * (1 + threshold):
+                regressions.append(f"{name}.{key}: {actual} > baseline {expected}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cleanup-rows", type=int, default=20000)
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument("--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--save-baseline", help="write the results JSON as the new baseline")
+    parser.add_argument("--baseline", help="compare against this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "save_baseline", "baseline")},
+        },
+        "results": asyncio.run(run(args)),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
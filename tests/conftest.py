@@ -0,0 +1,12 @@
+import fakeredis
+import pytest
+from arq.connections import ArqRedis
+from fakeredis.aioredis import FakeAsyncRedisConnection
+from redis.asyncio import ConnectionPool
+
+
+@pytest.fixture
+def redis() -> ArqRedis:
+    """An Arq pool on a fresh in-process fakeredis server."""
+    pool = ConnectionPool(connection_class=FakeAsyncRedisConnection, server=fakeredis.FakeServer())
+    return ArqRedis(connection_pool=pool)
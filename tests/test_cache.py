@@ -0,0 +1,43 @@
+from backend import cache
+from backend.cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    entries = TTLCache(max_size=10, ttl_seconds=5)
+    entries.set("a", 1)
+    entries.set("b", 2, ttl_seconds=60)
+
+    clock.now += 5
+    assert entries.get("a") == 1
+    clock.now += 0.1
+    assert entries.get("a") is None
+    assert entries.get("b") == 2
+    assert len(entries) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    entries = TTLCache(max_size=2, ttl_seconds=60)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+    assert entries.get("b") is None
+    assert entries.get("a") == 1
+    assert entries.get("c") == 3
+
+
+def test_zero_size_or_ttl_disables_the_cache():
+    for entries in (TTLCache(max_size=0, ttl_seconds=60), TTLCache(max_size=10, ttl_seconds=0)):
+        entries.set("a", 1)
+        assert not entries.enabled
+        assert entries.get("a") is None
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timezone
+import httpx
+import pytest
+from fastapi import FastAPI
+from backend.api.jobs import _accepts_encoding, _etag_matches, router
+from backend.core_config import settings
+from backend.db.session import get_read_db
+from backend.domain.jobs import JOB_READ_FIELDS, decode_cursor, encode_cursor, parse_fields
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, "0190a2b3-job")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, "0190a2b3-job")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "WzFd", "WyJub3QgYSBkYXRlIiwiaWQiXQ"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_parse_fields_keeps_response_order():
+    assert parse_fields(None) == JOB_READ_FIELDS
+    assert parse_fields("") == JOB_READ_FIELDS
+    assert parse_fields(" status, id ,status") == ("id", "status")
+
+
+def test_parse_fields_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Unknown fields: password, secret"):
+        parse_fields("id,secret,password")
+
+
+async def _no_db():
+    yield None
+
+
+def _list_jobs(params: dict) -> httpx.Response:
+    # Bad query parameters are rejected before the session is used
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_read_db] = _no_db
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(
+                "/jobs/", params=params, headers={"Authorization": f"Bearer {settings.API_KEY}"}
+            )
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "params, detail",
+    [
+        ({"fields": "id,bogus"}, "Unknown fields: bogus"),
+        ({"cursor": "not-a-cursor"}, "Invalid cursor"),
+        ({"cursor": encode_cursor(datetime.now(timezone.utc), "x"), "offset": 10},
+         "Use either cursor or offset, not both"),
+    ],
+)
+def test_list_jobs_rejects_bad_parameters(params, detail):
+    response = _list_jobs(params)
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ('"v2"', False),
+        ('"v1"', True),
+        ('W/"v1"', True),
+        ('"v0", W/"v1"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    assert _etag_matches(if_none_match, '"v1"') is matches
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, accepted",
+    [
+        (None, False),
+        ("gzip", True),
+        ("GZIP;q=0.5", True),
+        ("br, deflate", False),
+        ("gzip;q=0", False),
+        ("gzip;q=bogus", False),
+        ("*", True),
+        ("*;q=0.1, gzip;q=0", False),
+        ("identity, *;q=0", False),
+    ],
+)
+def test_accepts_encoding(accept_encoding, accepted):
+    assert _accepts_encoding(accept_encoding, "gzip") is accepted
@@ -0,0 +1,58 @@
+import asyncio
+from worker.lanes import WeightedSlots
+
+
+def test_free_slot_goes_to_any_lane_without_waiting():
+    async def run():
+        slots = WeightedSlots(2, {"high": 3, "normal": 1})
+        await slots.for_lane("normal").acquire()
+        await slots.for_lane("normal").acquire()
+        return slots.running, slots.free
+
+    running, free = asyncio.run(run())
+    # An idle lane lends its share: normal may hold every slot
+    assert running == {"high": 0, "normal": 2}
+    assert free == 0
+
+
+def test_released_slots_are_granted_by_running_to_weight_ratio():
+    async def run():
+        slots = WeightedSlots(4, {"high": 3, "normal": 1})
+        for _ in range(4):
+            await slots.acquire("normal")
+        granted = []
+
+        async def wait(lane):
+            await slots.acquire(lane)
+            granted.append(lane)
+
+        waiters = [asyncio.create_task(wait(lane)) for lane in ["normal"] * 4 + ["high"] * 4]
+        await asyncio.sleep(0)
+        for _ in range(4):
+            slots.release("normal")
+            await asyncio.sleep(0)
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        return granted, slots.running
+
+    granted, running = asyncio.run(run())
+    # high waits at 0/3 until it holds 3 slots against normal's 0/1
+    assert granted == ["high", "high", "high", "normal"]
+    assert running == {"high": 3, "normal": 1}
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def run():
+        slots = WeightedSlots(1, {"high": 1, "normal": 1})
+        await slots.acquire("normal")
+        waiter = asyncio.create_task(slots.acquire("high"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        slots.release("normal")
+        return slots.running, slots.free
+
+    running, free = asyncio.run(run())
+    assert running == {"high": 0, "normal": 0}
+    assert free == 1
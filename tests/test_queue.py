@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from arq.utils import timestamp_ms
+from backend.db.models import JobPriority
+from backend.services.queue import (
+    FAIR_DEFERRED_CLIENTS_KEY, VIRTUAL_SCORE_LIMIT, JobQueue, QueuedJob, advance_virtual_time,
+    lane_queue_name,
+)
+
+LANE = lane_queue_name(JobPriority.normal)
+BACKFILL = 1000
+
+
+async def _backfill(queue: JobQueue, client_id=None):
+    await queue.enqueue_many([
+        QueuedJob(f"backfill-{i}", client_id=client_id) for i in range(BACKFILL)
+    ])
+
+
+def test_cron_job_is_promoted_ahead_of_an_anonymous_backfill(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await _backfill(queue)
+        # What Arq's scheduler writes for a cron function: an epoch-ms score
+        await redis.zadd(LANE, {"cron:dispatch_scheduled_jobs:1700000000000": timestamp_ms()})
+        promoted = await queue.promote_due()
+        return promoted, await redis.zrank(LANE, "cron:dispatch_scheduled_jobs:1700000000000")
+
+    promoted, rank = asyncio.run(run())
+    assert promoted == 1
+    assert rank == 0
+
+
+def test_retry_without_recorded_client_is_not_queued_behind_the_backlog(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await _backfill(queue)
+        # Arq's Retry re-scores the job at now + defer (here already due)
+        await redis.zadd(LANE, {"retried": timestamp_ms() - 1})
+        await queue.promote_due()
+        return await redis.zscore(LANE, "retried")
+
+    score = asyncio.run(run())
+    assert score < VIRTUAL_SCORE_LIMIT
+    assert score <= 1
+
+
+def test_due_deferred_job_takes_its_clients_turn(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await _backfill(queue, client_id="backfill")
+        run_at = datetime.now(timezone.utc) + timedelta(milliseconds=50)
+        await queue.enqueue_many([QueuedJob("deferred", run_at, client_id="interactive")])
+        assert await queue.promote_due() == 0
+        await asyncio.sleep(0.1)
+        assert await queue.promote_due() == 1
+        return await redis.zrank(LANE, "deferred"), await redis.hlen(FAIR_DEFERRED_CLIENTS_KEY)
+
+    rank, recorded = asyncio.run(run())
+    # Interleaved with the backfill's first jobs instead of after all of them
+    assert rank <= 1
+    assert recorded == 0
+
+
+def test_interleaves_clients_within_a_lane(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await _backfill(queue, client_id="backfill")
+        await queue.enqueue_many([QueuedJob(f"interactive-{i}", client_id="interactive") for i in range(3)])
+        return [job_id.decode() for job_id in await redis.zrange(LANE, 0, 5)]
+
+    order = asyncio.run(run())
+    assert [job_id.split("-")[0] for job_id in order] == ["backfill", "interactive"] * 3
+
+
+def test_idle_client_starts_at_the_lane_clock(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await queue.enqueue_many([QueuedJob("early", client_id="idle")])
+        await _backfill(queue, client_id="backfill")
+        # The worker has worked through half of the backfill meanwhile
+        await advance_virtual_time(redis, JobPriority.normal, BACKFILL // 2)
+        await queue.enqueue_many([QueuedJob("late", client_id="idle")])
+        return await redis.zscore(LANE, "late")
+
+    # One job long ago banks no credit: it is tagged from the clock, not from 1
+    assert asyncio.run(run()) == BACKFILL // 2 + 1
+
+
+def test_lanes_keep_separate_tags(redis):
+    async def run():
+        queue = JobQueue(redis)
+        await _backfill(queue, client_id="backfill")
+        await queue.enqueue_many([QueuedJob("urgent", priority=JobPriority.high, client_id="backfill")])
+        return await redis.zscore(lane_queue_name(JobPriority.high), "urgent")
+
+    assert asyncio.run(run()) == 1
+
+
+def test_abort_forgets_a_deferred_jobs_client(redis):
+    async def run():
+        queue = JobQueue(redis)
+        run_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        await queue.enqueue_many([QueuedJob("deferred", run_at, client_id="interactive")])
+        aborted = await queue.abort("deferred", JobPriority.normal)
+        return aborted, await redis.zcard(LANE), await redis.hlen(FAIR_DEFERRED_CLIENTS_KEY)
+
+    assert asyncio.run(run()) == (True, 0, 0)
@@ -0,0 +1,82 @@
+import asyncio
+import csv
+import io
+import threading
+from datetime import datetime, timezone
+import pytest
+from backend.compression import FILE_SUFFIXES, GZIP, ZSTD, iter_decompressed
+from backend.core_config import settings
+from backend.db.models import Job
+from backend.reports.registry import ReportTemplate
+from backend.reports.writer import RenderStopped, write_report
+
+ROWS = 25
+
+
+def _rows(ctx):
+    for i in range(ROWS):
+        yield [i, f"row-{i}"]
+
+
+async def _async_rows(ctx):
+    for row in _rows(ctx):
+        yield row
+
+
+def _template(rows=_rows, execution="thread") -> ReportTemplate:
+    # Built directly so the test does not add to the global registry
+    return ReportTemplate(name="test_rows", header=["n", "label"], rows=rows, execution=execution)
+
+
+def _job() -> Job:
+    return Job(id="test", template_name="test_rows", created_at=datetime.now(timezone.utc))
+
+
+def _read(path: str, encoding) -> list:
+    if encoding is None:
+        with open(path, newline="") as f:
+            return list(csv.reader(f))
+    text = b"".join(iter_decompressed(path, encoding)).decode()
+    return list(csv.reader(io.StringIO(text, newline="")))
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_ROW_BATCH_SIZE", 10)
+
+
+@pytest.mark.parametrize("encoding", [None, GZIP, ZSTD])
+@pytest.mark.parametrize("rows, execution", [(_rows, "thread"), (_rows, "inline"), (_async_rows, "thread")])
+def test_write_report(tmp_path, encoding, rows, execution):
+    if encoding == ZSTD:
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / f"report.csv{FILE_SUFFIXES[encoding]}")
+
+    count = asyncio.run(write_report(_template(rows, execution), _job(), path, encoding=encoding))
+
+    assert count == ROWS
+    assert _read(path, encoding) == [["n", "label"]] + [[str(i), f"row-{i}"] for i in range(ROWS)]
+    assert [p.name for p in tmp_path.iterdir()] == [f"report.csv{FILE_SUFFIXES[encoding]}"]
+
+
+@pytest.mark.parametrize("rows, execution", [(_rows, "thread"), (_rows, "inline"), (_async_rows, "thread")])
+def test_stopped_render_leaves_no_file(tmp_path, rows, execution):
+    stop = threading.Event()
+    stop.set()
+    path = str(tmp_path / "report.csv.gz")
+
+    with pytest.raises(RenderStopped):
+        asyncio.run(write_report(_template(rows, execution), _job(), path, encoding=GZIP, stop=stop))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_render_leaves_no_file(tmp_path):
+    def broken_rows(ctx):
+        yield from _rows(ctx)
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError, match="query failed"):
+        asyncio.run(write_report(_template(broken_rows), _job(), str(tmp_path / "report.csv")))
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,73 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict
+
+
+class WeightedSlots:
+    """Job slots shared by the per-lane Arq workers of one process.
+
+    A free slot goes to whichever lane asks for it, so a lane with no work waiting
+    lends its share to the others. When lanes are queued up for slots, each released
+    slot goes to the waiting lane with the lowest running / weight ratio, which
+    converges on a split of slots proportional to the weights.
+    """
+
+    def __init__(self, size: int, weights: Dict[str, int]):
+        self.free = size
+        self.weights = weights
+        self.running = {lane: 0 for lane in weights}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in weights}
+
+    def for_lane(self, lane: str) -> "LaneSlots":
+        return LaneSlots(self, lane)
+
+    async def acquire(self, lane: str) -> bool:
+        if self.free > 0 and not any(self._waiters.values()):
+            self._take(lane)
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted just before the waiter was cancelled: hand the slot back
+                self.release(lane)
+            else:
+                self._waiters[lane].remove(fut)
+            raise
+        return True
+
+    def release(self, lane: str):
+        self.running[lane] -= 1
+        self.free += 1
+        self._grant()
+
+    def _take(self, lane: str):
+        self.free -= 1
+        self.running[lane] += 1
+
+    def _grant(self):
+        while self.free > 0:
+            waiting = [lane for lane, waiters in self._waiters.items() if waiters]
+            if not waiting:
+                return
+            lane = min(waiting, key=lambda name: self.running[name] / self.weights[name])
+            self._take(lane)
+            self._waiters[lane].popleft().set_result(None)
+
+
+class LaneSlots:
+    """The acquire/release view of `WeightedSlots` an Arq worker uses as its `sem`."""
+
+    __slots__ = ("slots", "lane")
+
+    def __init__(self, slots: WeightedSlots, lane: str):
+        self.slots = slots
+        self.lane = lane
+
+    async def acquire(self) -> bool:
+        return await self.slots.acquire(self.lane)
+
+    def release(self):
+        self.slots.release(self.lane)
@@ -1,96 +1,475 @@
-import csv
+from backend.import_clock import IMPORT_STARTED
+import asyncio
+import multiprocessing
 import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import suppress
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import select
+from typing import Optional
+from backend.compression import FILE_SUFFIXES, configured_encoding
 from backend.core_config import settings
-from backend.db.session import SessionLocal
-from backend.db.models import Job, JobStatus
+from backend.db.models import Job, JobPriority, JobStatus
+from backend.db.session import SessionLocal, engine, warm_pool
+from backend.metrics import (
+    CLEANUP_DELETED_FILES,
+    CLEANUP_DELETED_JOBS,
+    CLEANUP_DROPPED_PARTITIONS,
+    CLEANUP_FILE_ERRORS,
+    CLEANUP_LAST_RUN_SECONDS,
+    JOBS_TIMED_OUT,
+    ORPHAN_SWEEP_DELETED_FILES,
+    RESULT_CACHE_REQUESTS,
+    SCHEDULER_DISPATCHED_JOBS,
+    STARTUP_SECONDS,
+    observe_job_timings,
+)
+from backend.reports import TEMPLATES, ReportTemplate, get_template
+from backend.reports.writer import RenderStopped, write_report
 from backend.repo.jobs import JobsRepo
+from backend.repo.partitions import JobPartitionsRepo
+from backend.services.queue import (
+    JobQueue, QueuedJob, advance_virtual_time, lane_queue_name, warm_redis,
+)
+from backend.services.events import JobEventHub, JobWaiter
+from backend.services.run_estimates import record_run_seconds
+from backend.services.status_cache import JobStatusCache
+from backend.storage import artifact_key, get_storage, storage_for
 from backend.logger import logger, setup_logging
-from arq.connections import RedisSettings
+from structlog.contextvars import bound_contextvars
+from arq.connections import RedisSettings, create_pool
 from arq.cron import cron
+from arq.worker import create_worker
+from worker.lanes import WeightedSlots
+from redis.exceptions import RedisError
+from sqlalchemy.exc import DBAPIError
 
 setup_logging()
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+_unlink_executor = ThreadPoolExecutor(
+    max_workers=settings.CLEANUP_UNLINK_WORKERS, thread_name_prefix="cleanup-unlink"
+)
+
+_first_job_done = False
+
+def _record_first_job():
+    # Cold start as seen by the queue: worker.main import to the first job finished
+    global _first_job_done
+    if _first_job_done:
+        return
+    _first_job_done = True
+    seconds = time.perf_counter() - IMPORT_STARTED
+    STARTUP_SECONDS.labels(component="worker", phase="first_job").set(seconds)
+    logger.info("worker_first_job_finished", seconds_since_start=round(seconds, 3))
+
+async def _finish(repo: JobsRepo, status_cache: JobStatusCache, job: Job):
+    await status_cache.set(job, publish=True)
+    observe_job_timings(job)
+    _record_first_job()
+    if job.result_key is None:
+        return
+    # Identical requests coalesced onto this job share its outcome
+    for follower in await repo.settle_followers(job):
+        await status_cache.set(follower, publish=True)
+        observe_job_timings(follower)
+
+async def _cached_result(
+    repo: JobsRepo, template: ReportTemplate, job: Job, result_key: str
+) -> Optional[Job]:
+    # Also covers jobs that skipped the API-side lookup (batch submissions, or queued
+    # before an identical job finished)
+    fresh_after = datetime.now(timezone.utc) - timedelta(seconds=template.cache_ttl)
+    source = await repo.get_fresh_result(result_key, fresh_after)
+    if source is None or source.id == job.id:
+        return None
+    return source
+
+async def _stop_event(ctx, template: ReportTemplate):
+    # Pool processes can't see a threading.Event: they get a Manager Event proxy.
+    # Every proxy call is a round trip to the manager process, so it runs off the loop.
+    if template.execution == "process" and ctx.get("process_manager") is not None:
+        return await asyncio.to_thread(ctx["process_manager"].Event)
+    return threading.Event()
+
+async def _watch_for_stop(
+    waiter: JobWaiter, status_cache: JobStatusCache, stop, timeout: float
+) -> str:
+    """Set `stop` once the job is cancelled or has run for `timeout` seconds; returns why."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            reason = "timeout"
+            break
+        if not await waiter.wait(remaining):
+            continue
+        # None: the events listener reconnected and may have missed the cancellation
+        entry = waiter.entry or await status_cache.get(waiter.job_id)
+        if entry is not None and entry.status == JobStatus.cancelled:
+            reason = "cancelled"
+            break
+    if isinstance(stop, threading.Event):
+        stop.set()
+    else:
+        await asyncio.get_running_loop().run_in_executor(None, stop.set)
+    return reason
+
+async def _render_stopped(
+    repo: JobsRepo, status_cache: JobStatusCache, job: Job, template: ReportTemplate,
+    reason: str, run_seconds: float,
+):
+    if reason == "cancelled":
+        # The API already stored and published the cancelled status (and the metrics)
+        logger.info("processing_job_cancelled", job_id=job.id, run_seconds=round(run_seconds, 3))
+        return
+    JOBS_TIMED_OUT.labels(template=template.name).inc()
+    logger.warning("processing_job_timed_out", job_id=job.id, timeout=template.timeout)
+    # Not retried: a render that hit its deadline would most likely hit it again
+    failed_job = await repo.fail(job.id, f"Timed out after {template.timeout:g}s")
+    if failed_job:
+        await _finish(repo, status_cache, failed_job)
+
 async def process_job(ctx, job_id: str):
+    # Every event logged while the job runs, including from repo and report code, carries job_id
+    with bound_contextvars(job_id=job_id):
+        # Subscribed before the claim, so a cancellation right after it is not missed
+        with ctx["event_hub"].subscribe(job_id) as waiter:
+            await _process_job(ctx, job_id, waiter)
+
+async def _process_job(ctx, job_id: str, waiter: JobWaiter):
     logger.info("processing_job_started", job_id=job_id)
     
+    status_cache = JobStatusCache(ctx["redis"])
+
     async with SessionLocal() as session:
         repo = JobsRepo(session)
-        job = await repo.get_by_id(job_id)
+        # Update status to running; only one worker can win the claim
+        job = await repo.claim(job_id, reclaim=ctx.get("job_try", 1) > 1)
         
         if not job:
-            logger.error("job_not_found", job_id=job_id)
+            logger.warning("processing_job_not_claimed", job_id=job_id)
             return
 
+        await advance_virtual_time(ctx["redis"], job.priority, ctx.get("score"))
+        await status_cache.set(job, publish=True)
+
         try:
-            # Update status to running
-            job.status = JobStatus.running
-            job.started_at = datetime.now(timezone.utc)
-            await repo.update(job)
-            
-            # Simulate work / Generate CSV
-            file_name = f"report_{job.id}.csv"
-            file_path = os.path.join(settings.FILES_DIR, file_name)
-            
-            os.makedirs(settings.FILES_DIR, exist_ok=True)
+            template = get_template(job.template_name)
+            result_key = None
+            if settings.RESULT_CACHE_ENABLED and template.cache_ttl:
+                result_key = job.result_key or template.cache_key(job.metadata_info)
+                source = await _cached_result(repo, template, job, result_key)
+                if source is None and job.result_key is None:
+                    # Jobs created with a key were already counted by the API
+                    RESULT_CACHE_REQUESTS.labels(result="miss").inc()
+                elif source is not None:
+                    RESULT_CACHE_REQUESTS.labels(result="hit").inc()
+                    job = await repo.complete_from(job_id, source)
+                    if job:
+                        await _finish(repo, status_cache, job)
+                    logger.info("processing_job_cache_hit", job_id=job_id, source_job_id=source.id)
+                    return
+
+            # Generate the report off the event loop
+            encoding = configured_encoding()
+            storage = get_storage()
+            key = artifact_key(job.id, FILE_SUFFIXES[encoding])
+            staging_path = storage.staging_path(key)
             
-            # Simple CSV content
-            with open(file_path, mode='w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Job ID", "Created At", "Template"])
-                writer.writerow([job.id, job.created_at.isoformat(), job.template_name])
+            # Stops at the next row batch once the job is cancelled or past its deadline
+            stop = await _stop_event(ctx, template)
+            watcher = asyncio.create_task(
+                _watch_for_stop(waiter, status_cache, stop, template.timeout)
+            )
+            render_started = time.monotonic()
+            try:
+                row_count = await write_report(
+                    template, job, staging_path, encoding,
+                    process_pool=ctx.get("process_pool"), stop=stop,
+                )
+            except RenderStopped:
+                await _render_stopped(
+                    repo, status_cache, job, template, watcher.result(),
+                    time.monotonic() - render_started,
+                )
+                return
+            finally:
+                watcher.cancel()
+            # Local: already in place; S3: streamed up from the staging file
+            file_path = await asyncio.to_thread(storage.save, staging_path, key)
             
             # Update status to succeeded
-            job.status = JobStatus.succeeded
-            job.completed_at = datetime.now(timezone.utc)
-            job.result_file_path = file_path
-            await repo.update(job)
+            job = await repo.complete(job_id, file_path, encoding, result_key)
+            if job:
+                await _finish(repo, status_cache, job)
+                # What a cancellation of the next such job saves (see cancel_job)
+                await record_run_seconds(
+                    ctx["redis"], template.name, (job.completed_at - job.started_at).total_seconds()
+                )
             
-            logger.info("processing_job_succeeded", job_id=job_id, file_path=file_path)
+            logger.info(
+                "processing_job_succeeded", job_id=job_id, file_path=file_path, row_count=row_count
+            )
             
+        except asyncio.CancelledError:
+            # Arq's job_timeout (or a shutdown) cancelled the task: fail the job so
+            # identical requests waiting on it get its outcome instead of the key
+            # staying held
+            logger.error("processing_job_interrupted", job_id=job_id)
+            await session.rollback()
+            failed_job = await repo.fail(job_id, "Interrupted by the worker (job_timeout or shutdown)")
+            if failed_job:
+                await _finish(repo, status_cache, failed_job)
+            raise
         except Exception as e:
             logger.exception("processing_job_failed", job_id=job_id, error=str(e))
-            job.status = JobStatus.failed
-            job.error_message = str(e)
-            job.completed_at = datetime.now(timezone.utc)
-            await repo.update(job)
+            await session.rollback()
+            failed_job = await repo.fail(job_id, str(e))
+            if failed_job:
+                await _finish(repo, status_cache, failed_job)
             # Re-raise to trigger Arq retry if needed, 
             # but requirement says retry ONLY unexpected runtime exceptions
             # Arq retries based on max_retries in Worker class
             raise e
 
+def _remove_file(file_path: str) -> bool:
+    return storage_for(file_path).delete(file_path)
+
+async def _ensure_partitions():
+    async with SessionLocal() as session:
+        await JobPartitionsRepo(session).ensure_upcoming()
+
 async def cleanup_old_jobs(ctx):
     logger.info("cleanup_old_jobs_started")
-    retention_days = 30
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
-    
+    started = time.monotonic()
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=settings.JOB_RETENTION_DAYS)
+    loop = asyncio.get_running_loop()
+
+    # Partitions for the coming days first, so inserts never miss one
+    await _ensure_partitions()
+
+    deleted_count = 0
+    deleted_files_count = 0
     async with SessionLocal() as session:
-        # 1. Find jobs to delete to also remove their files
-        result = await session.execute(
-            select(Job).where(Job.created_at < cutoff_date)
-        )
-        jobs_to_delete = result.scalars().all()
-        
-        deleted_count = 0
-        for job in jobs_to_delete:
-            if job.result_file_path and os.path.exists(job.result_file_path):
-                try:
-                    os.remove(job.result_file_path)
-                    logger.info("cleanup_file_deleted", job_id=job.id, file_path=job.result_file_path)
-                except Exception as e:
-                    logger.error("cleanup_file_failed", job_id=job.id, error=str(e))
-            
-            await session.delete(job)
-            deleted_count += 1
-            
-        await session.commit()
-        logger.info("cleanup_old_jobs_finished", deleted_jobs_count=deleted_count)
+        repo = JobPartitionsRepo(session)
+        # One DROP TABLE per expired day instead of row-level deletes: no dead tuples,
+        # no vacuum debt, and the time taken no longer grows with the row count.
+        for day in await repo.expired_partitions(cutoff_date):
+            # Files first, one batch at a time (unlinked and awaited before the next
+            # is read); a run stopped half way finds the rest on its next pass
+            async for paths in repo.unreferenced_result_paths(day, settings.CLEANUP_BATCH_SIZE):
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(_unlink_executor, _remove_file, path) for path in paths),
+                    return_exceptions=True,
+                )
+                for path, result in zip(paths, results):
+                    if isinstance(result, Exception):
+                        CLEANUP_FILE_ERRORS.inc()
+                        logger.error("cleanup_file_failed", file_path=path, error=str(result))
+                    elif result:
+                        deleted_files_count += 1
+                        CLEANUP_DELETED_FILES.inc()
+
+            try:
+                row_count = await repo.drop_partition(day)
+            except DBAPIError as e:
+                # Typically lock_timeout behind a long-running query; next run retries
+                logger.warning("cleanup_partition_drop_failed", partition=str(day), error=str(e))
+                break
+
+            deleted_count += row_count
+            CLEANUP_DELETED_JOBS.inc(row_count)
+            CLEANUP_DROPPED_PARTITIONS.inc()
+            logger.info(
+                "cleanup_old_jobs_progress",
+                partition=str(day),
+                deleted_jobs_count=deleted_count,
+                deleted_files_count=deleted_files_count,
+            )
+
+    CLEANUP_LAST_RUN_SECONDS.set(time.monotonic() - started)
+    logger.info(
+        "cleanup_old_jobs_finished",
+        deleted_jobs_count=deleted_count,
+        deleted_files_count=deleted_files_count,
+    )
+
+async def sweep_orphan_results(ctx):
+    """Delete stored artifacts no job references.
+
+    They come from a worker dying between upload and commit, a failed status update
+    after the render, or .tmp files of a crashed render. Storage is listed in
+    CLEANUP_BATCH_SIZE batches and each batch checked with one query, so memory stays
+    bounded; artifacts younger than ORPHAN_SWEEP_MIN_AGE_SECONDS are left alone, as
+    their job may not have committed yet.
+    """
+    logger.info("sweep_orphan_results_started")
+    storage = get_storage()
+    cutoff = time.time() - settings.ORPHAN_SWEEP_MIN_AGE_SECONDS
+    loop = asyncio.get_running_loop()
+    batches = storage.scan(settings.CLEANUP_BATCH_SIZE)
+    scanned_count = 0
+    deleted_count = 0
+    async with SessionLocal() as session:
+        repo = JobsRepo(session)
+        # Listing blocks (scandir / S3 requests): one batch at a time on a thread
+        while batch := await asyncio.to_thread(next, batches, None):
+            scanned_count += len(batch)
+            candidates = [ref for ref, modified in batch if modified < cutoff]
+            if not candidates:
+                continue
+            referenced = await repo.referenced_result_paths(candidates)
+            # Don't hold a snapshot open across the whole walk
+            await session.rollback()
+            orphans = [ref for ref in candidates if ref not in referenced]
+            results = await asyncio.gather(
+                *(loop.run_in_executor(_unlink_executor, _remove_file, ref) for ref in orphans),
+                return_exceptions=True,
+            )
+            for ref, result in zip(orphans, results):
+                if isinstance(result, Exception):
+                    CLEANUP_FILE_ERRORS.inc()
+                    logger.error("sweep_orphan_result_failed", file_path=ref, error=str(result))
+                elif result:
+                    deleted_count += 1
+                    ORPHAN_SWEEP_DELETED_FILES.inc()
+    logger.info(
+        "sweep_orphan_results_finished", scanned_count=scanned_count, deleted_count=deleted_count
+    )
+
+async def dispatch_scheduled_jobs(ctx):
+    """Enqueue held far-future jobs once their run_at is within SCHEDULER_HORIZON_SECONDS.
+
+    Each waits in its lane under its run_at score until _promote_deferred_jobs gives
+    it a start tag; only near-term jobs live in Redis.
+    """
+    until = datetime.now(timezone.utc) + timedelta(seconds=settings.SCHEDULER_HORIZON_SECONDS)
+    queue = JobQueue(ctx["redis"])
+    dispatched_count = 0
+    async with SessionLocal() as session:
+        repo = JobsRepo(session)
+        while True:
+            jobs = await repo.dispatch_due(until, settings.SCHEDULER_BATCH_SIZE)
+            if not jobs:
+                break
+            try:
+                await queue.enqueue_many([
+                    QueuedJob(job.id, job.run_at, job.priority, job.client_id) for job in jobs
+                ])
+            except Exception:
+                # Still held: the next run retries this batch
+                await session.rollback()
+                raise
+            # Enqueueing is idempotent, so a failed commit only means a re-enqueue later
+            await session.commit()
+            dispatched_count += len(jobs)
+            SCHEDULER_DISPATCHED_JOBS.inc(len(jobs))
+            if len(jobs) < settings.SCHEDULER_BATCH_SIZE:
+                break
+    if dispatched_count:
+        logger.info("scheduled_jobs_dispatched", dispatched_count=dispatched_count)
+
+async def _promote_deferred_jobs(queue: JobQueue):
+    # Background loop (not a cron: those run at most once a minute), so a due job
+    # waits at most DEFERRED_PROMOTE_INTERVAL_SECONDS before it gets its start tag
+    while True:
+        try:
+            promoted = await queue.promote_due()
+        except RedisError as e:
+            logger.warning("deferred_promotion_failed", error=str(e))
+            promoted = 0
+        if not promoted:
+            await asyncio.sleep(settings.DEFERRED_PROMOTE_INTERVAL_SECONDS)
+
+def _process_context():
+    # Not fork: by startup the worker runs threads (log writer, unlink pool) and holds
+    # DB/Redis sockets that children must not inherit. forkserver children are forked
+    # from a clean single-threaded server that has only loaded the report registry.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    mp_context = multiprocessing.get_context("forkserver")
+    mp_context.set_forkserver_preload(["backend.reports"])
+    return mp_context
+
+async def _start_process_pool(ctx):
+    # CPU-bound templates render here so they cannot stall the loop (heartbeats,
+    # other jobs, cron); status bookkeeping stays on the loop. The manager process
+    # serves the stop events of process renders; starting it blocks.
+    mp_context = _process_context()
+    ctx["process_pool"] = ProcessPoolExecutor(
+        max_workers=settings.WORKER_PROCESS_POOL_SIZE or os.cpu_count(), mp_context=mp_context
+    )
+    loop = asyncio.get_running_loop()
+    _, ctx["process_manager"] = await asyncio.gather(
+        loop.run_in_executor(ctx["process_pool"], os.getpid),
+        asyncio.to_thread(mp_context.Manager),
+    )
+
+async def startup(ctx):
+    warmup_started = time.perf_counter()
+    # Pools are opened here rather than by the first jobs: the DB pool, Arq's Redis
+    # pool, and the process pool (children start on the first submit), which only
+    # exists if a registered template renders in "process" mode
+    warmups = [warm_pool(engine), warm_redis(ctx["redis"])]
+    if any(template.execution == "process" for template in TEMPLATES.values()):
+        warmups.append(_start_process_pool(ctx))
+    await asyncio.gather(*warmups)
+    # Status events: how a running job learns it was cancelled
+    ctx["event_hub"] = JobEventHub(ctx["redis"])
+    await ctx["event_hub"].start()
+    ctx["deferred_promoter"] = asyncio.create_task(_promote_deferred_jobs(JobQueue(ctx["redis"])))
+    # A worker restarted after days offline must not wait for the 3 AM cron
+    await _ensure_partitions()
+    if settings.WORKER_METRICS_PORT:
+        # Only needed when the worker serves its own metrics
+        from prometheus_client import start_http_server
+        start_http_server(settings.WORKER_METRICS_PORT)
+
+    warmup_seconds = time.perf_counter() - warmup_started
+    STARTUP_SECONDS.labels(component="worker", phase="import").set(IMPORT_SECONDS)
+    STARTUP_SECONDS.labels(component="worker", phase="warmup").set(warmup_seconds)
+    logger.info(
+        "worker_started",
+        max_jobs=settings.WORKER_MAX_JOBS,
+        import_seconds=round(IMPORT_SECONDS, 3),
+        warmup_seconds=round(warmup_seconds, 3),
+    )
+
+async def shutdown(ctx):
+    deferred_promoter = ctx.pop("deferred_promoter", None)
+    if deferred_promoter is not None:
+        deferred_promoter.cancel()
+        with suppress(asyncio.CancelledError):
+            await deferred_promoter
+    process_pool = ctx.pop("process_pool", None)
+    if process_pool is not None:
+        await asyncio.to_thread(process_pool.shutdown, wait=True, cancel_futures=True)
+    process_manager = ctx.pop("process_manager", None)
+    if process_manager is not None:
+        await asyncio.to_thread(process_manager.shutdown)
+    event_hub = ctx.pop("event_hub", None)
+    if event_hub is not None:
+        await event_hub.close()
+    await engine.dispose()
 
 class WorkerSettings:
-    functions = [process_job, cleanup_old_jobs]
+    functions = [process_job, cleanup_old_jobs, sweep_orphan_results, dispatch_scheduled_jobs]
+    on_startup = startup
+    on_shutdown = shutdown
+    max_jobs = settings.WORKER_MAX_JOBS
+    # Hard limit; renders normally stop at their own (shorter) template deadline
+    job_timeout = (
+        max(settings.JOB_TIMEOUT_SECONDS, *settings.TEMPLATE_TIMEOUTS.values())
+        + settings.JOB_TIMEOUT_GRACE_SECONDS
+    )
     cron_jobs = [
-        cron(cleanup_old_jobs, hour=3, minute=0) # Daily at 3 AM
+        cron(cleanup_old_jobs, hour=3, minute=0), # Daily at 3 AM
+        cron(sweep_orphan_results, hour=4, minute=0), # Daily at 4 AM, after retention
+        cron(dispatch_scheduled_jobs, second=0, run_at_startup=True), # Every minute
     ]
     redis_settings = RedisSettings(host=settings.REDIS_HOST, port=settings.REDIS_PORT)
     # retries: max attempts: 3. Arq max_retries is attempts - 1.
@@ -102,3 +481,54 @@ class WorkerSettings:
         if retry_count < len(delays):
             return delays[retry_count]
         return delays[-1]
+
+async def run_lane_workers():
+    """Drain every priority lane from one process: `python -m worker.main`.
+
+    One Arq worker per lane queue, all sharing WORKER_MAX_JOBS slots split by
+    QUEUE_WEIGHTS (see worker/lanes.py). `arq worker.main.WorkerSettings` still
+    works but only drains the normal lane.
+    """
+    # One Redis pool for all lanes (Arq would open one per worker), warmed by startup
+    redis = await create_pool(WorkerSettings.redis_settings)
+    ctx = {"redis": redis}
+    await startup(ctx)
+    slots = WeightedSlots(
+        settings.WORKER_MAX_JOBS,
+        {priority.value: settings.QUEUE_WEIGHTS.get(priority.value, 1) for priority in JobPriority},
+    )
+    workers = []
+    for priority in JobPriority:
+        worker = create_worker(
+            WorkerSettings,
+            queue_name=lane_queue_name(priority),
+            # Startup/shutdown run once for the process; cron on one lane only
+            on_startup=None,
+            on_shutdown=None,
+            cron_jobs=WorkerSettings.cron_jobs if priority == JobPriority.normal else None,
+            handle_signals=False,
+            redis_pool=redis,
+        )
+        worker.ctx = ctx
+        worker.sem = slots.for_lane(priority.value)
+        workers.append(worker)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    tasks = [asyncio.create_task(worker.async_run()) for worker in workers]
+    stopping = asyncio.create_task(stop.wait())
+    try:
+        # A lane worker only returns early if it failed (e.g. Redis unreachable)
+        await asyncio.wait([*tasks, stopping], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stopping.cancel()
+        await asyncio.gather(*(worker.close() for worker in workers), return_exceptions=True)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await shutdown(ctx)
+        logger.info("worker_stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_lane_workers())